@@ -0,0 +1,143 @@
+# coding: utf-8
+
+"""
+    Which glyphs use which glyphs as components, in a group of sources.
+
+    UFOOperator keeps one ComponentGraph for each discrete location. The
+    graph is read once from all the sources in the discrete location, after
+    that glyphChanged only updates the edges of the changed glyph.
+    The nested base glyphs of each glyph are remembered for each source,
+    until the glyph or one of its base glyphs changes.
+"""
+
+
+def getComponentReferences(layer):
+    """ Return {base glyph name: names of the glyphs that use it} for a defcon or fontParts font or layer. """
+    if hasattr(layer, "componentReferences"):
+        # defcon reads these from the .glif files without loading the glyphs
+        return layer.componentReferences
+    if hasattr(layer, "getReverseComponentMapping"):
+        return layer.getReverseComponentMapping()
+    references = {}
+    for glyph in layer:
+        for component in glyph.components:
+            references.setdefault(component.baseGlyph, set()).add(glyph.name)
+    return references
+
+
+class ComponentGraph(object):
+
+    def __init__(self):
+        self._baseGlyphs = {}    # glyphName: {sourceName: set of base glyph names}
+        self._users = {}    # base glyph name: names of the glyphs that use it in any of the sources
+        self._closures = {}    # (sourceName, glyphName): all nested base glyph names
+        self.sourceNames = []
+        self.cycles = set()    # tuples of glyph names that use each other as components
+
+    def addSource(self, sourceName, componentReferences):
+        self.sourceNames.append(sourceName)
+        for baseGlyph, users in componentReferences.items():
+            for glyphName in users:
+                self._baseGlyphs.setdefault(glyphName, {}).setdefault(sourceName, set()).add(baseGlyph)
+                self._users.setdefault(baseGlyph, set()).add(glyphName)
+
+    def updateGlyph(self, glyphName, sourceName, baseGlyphs):
+        """ Set the base glyphs of glyphName in this source. """
+        before = self.getComponentNames(glyphName)
+        perSource = self._baseGlyphs.setdefault(glyphName, {})
+        if baseGlyphs:
+            perSource[sourceName] = set(baseGlyphs)
+        else:
+            perSource.pop(sourceName, None)
+        if not perSource:
+            del self._baseGlyphs[glyphName]
+        after = self.getComponentNames(glyphName)
+        for baseGlyph in before - after:
+            users = self._users[baseGlyph]
+            users.discard(glyphName)
+            if not users:
+                del self._users[baseGlyph]
+        for baseGlyph in after - before:
+            self._users.setdefault(baseGlyph, set()).add(glyphName)
+        # the nested base glyphs of this glyph and of the glyphs that use it are different now
+        changed = self.getDependencies(glyphName)
+        changed.add(glyphName)
+        # in all sources, so the cycles with these glyphs are found again
+        for name in changed:
+            for otherSourceName in self.sourceNames:
+                self._closures.pop((otherSourceName, name), None)
+        self.cycles = set(cycle for cycle in self.cycles if changed.isdisjoint(cycle))
+
+    def getComponentNames(self, glyphName, sourceName=None):
+        """ Return the base glyphs glyphName uses directly, in this source or in any source. """
+        perSource = self._baseGlyphs.get(glyphName, {})
+        if sourceName is not None:
+            return set(perSource.get(sourceName, ()))
+        names = set()
+        for baseGlyphs in perSource.values():
+            names.update(baseGlyphs)
+        return names
+
+    def getDependencies(self, glyphName):
+        """ Return the names of the glyphs that use glyphName, directly or nested in other components. """
+        found = set()
+        todo = [glyphName]
+        while todo:
+            name = todo.pop()
+            for user in self._users.get(name, ()):
+                if user not in found:
+                    found.add(user)
+                    todo.append(user)
+        # a glyph in a component cycle uses itself
+        found.discard(glyphName)
+        return found
+
+    def getBaseGlyphs(self, glyphName, sourceName=None):
+        """ Return the names of all base glyphs glyphName needs, nested components included,
+            in this source or in all sources.
+        """
+        if sourceName is None:
+            names = set()
+            for sourceName in self.sourceNames:
+                names.update(self.getBaseGlyphs(glyphName, sourceName))
+            return names
+        names, low = self._collectBaseGlyphs(glyphName, sourceName, [])
+        return set(names)
+
+    def _collectBaseGlyphs(self, glyphName, sourceName, stack):
+        # return (base glyph names, lowest position in the stack a component cycle goes back to)
+        key = (sourceName, glyphName)
+        if key in self._closures:
+            return self._closures[key], len(stack)
+        position = len(stack)
+        stack.append(glyphName)
+        names = set()
+        low = position
+        for baseGlyph in self.getComponentNames(glyphName, sourceName):
+            names.add(baseGlyph)
+            if baseGlyph in stack:
+                index = stack.index(baseGlyph)
+                self._addCycle(stack[index:])
+                low = min(low, index)
+                continue
+            baseNames, baseLow = self._collectBaseGlyphs(baseGlyph, sourceName, stack)
+            names.update(baseNames)
+            low = min(low, baseLow)
+        stack.pop()
+        names = frozenset(names)
+        if low >= position:
+            # complete: no cycle goes back to a glyph that is still being collected
+            self._closures[key] = names
+        return names, low
+
+    def _addCycle(self, names):
+        # start at the first name so the same cycle is only kept once
+        index = names.index(min(names))
+        self.cycles.add(tuple(names[index:] + names[:index]))
+
+    def getCycles(self):
+        """ Return the component cycles in all glyphs of all sources. """
+        for sourceName in self.sourceNames:
+            for glyphName in list(self._baseGlyphs):
+                self.getBaseGlyphs(glyphName, sourceName)
+        return sorted(self.cycles)
@@ -1,6 +1,7 @@
 # coding: utf-8
 
 from fontTools.pens.pointPen import AbstractPointPen
+from fontTools.pens.recordingPen import RecordingPointPen
 from defcon.pens.transformPointPen import TransformPointPen
 from defcon.objects.component import _defaultTransformation
 
@@ -27,6 +28,73 @@ class DecomposePointPen(object):
                 transformPointPen = TransformPointPen(self, transformation)
                 baseGlyph.drawPoints(transformPointPen)
 
+"""
+    Remember decomposed outlines
+
+"""
+
+class DecomposedOutlineCache(object):
+    """ The decomposed outlines of glyphs, as recorded point pen calls.
+        Each glyph is decomposed once for each layer, composites that use it
+        replay its outline through a transformation.
+    """
+
+    def __init__(self):
+        self._outlines = {}    # (layerKey, glyphName): tuple of point pen calls
+
+    def drawDecomposed(self, layerKey, layer, glyphName, pointPen):
+        """ Draw glyphName from layer with all components decomposed.
+            layerKey: something that identifies this layer of this source.
+        """
+        for method, args, kwargs in self.getOutline(layerKey, layer, glyphName):
+            getattr(pointPen, method)(*args, **kwargs)
+
+    def getOutline(self, layerKey, layer, glyphName, _decomposing=None):
+        key = (layerKey, glyphName)
+        outline = self._outlines.get(key)
+        if outline is None:
+            if _decomposing is None:
+                _decomposing = set()
+            _decomposing.add(glyphName)
+            pen = _DecomposingRecordingPointPen(self, layerKey, layer, _decomposing)
+            layer[glyphName].drawPoints(pen)
+            _decomposing.discard(glyphName)
+            outline = tuple(pen.value)
+            self._outlines[key] = outline
+        return outline
+
+    def removeGlyphNames(self, glyphNames):
+        # glyphNames: the changed glyphs and the glyphs that use them as components
+        for key in [key for key in self._outlines if key[1] in glyphNames]:
+            del self._outlines[key]
+
+    def clear(self):
+        self._outlines.clear()
+
+    def __len__(self):
+        return len(self._outlines)
+
+
+class _DecomposingRecordingPointPen(RecordingPointPen):
+
+    def __init__(self, cache, layerKey, layer, decomposing):
+        super().__init__()
+        self._cache = cache
+        self._layerKey = layerKey
+        self._layer = layer
+        self._decomposing = decomposing    # the glyphs being decomposed now, to stop at component cycles
+
+    def addComponent(self, baseGlyphName, transformation, identifier=None, **kwargs):
+        if baseGlyphName not in self._layer or baseGlyphName in self._decomposing:
+            return
+        outline = self._cache.getOutline(self._layerKey, self._layer, baseGlyphName, self._decomposing)
+        if tuple(transformation) == _defaultTransformation:
+            self.value.extend(outline)
+            return
+        transformPointPen = TransformPointPen(self, transformation)
+        for method, args, kwargs in outline:
+            getattr(transformPointPen, method)(*args, **kwargs)
+
 """
     Simple pen object to determine if a glyph contains any geometry.
 
@@ -0,0 +1,108 @@
+# coding: utf-8
+
+import os
+import hashlib
+
+from fontTools.misc import plistlib
+from fontTools.pens.recordingPen import RecordingPointPen
+
+"""
+    Fingerprints of the data an instance is made from.
+
+    A fingerprint is a short hash of the repr of some data. generateUFOs
+    stores the fingerprints of each instance in the data folder of the
+    instance UFO. On the next incremental run only the glyphs and the
+    font level data with a different fingerprint are made and written.
+"""
+
+fingerprintsDataName = "com.letterror.ufoProcessor.fingerprints.plist"
+
+
+def makeFingerprint(data):
+    return hashlib.sha1(repr(data).encode("utf-8")).hexdigest()
+
+
+def glyphFingerprint(glyph):
+    """ Return a fingerprint of everything in glyph that ends up in an instance glyph. """
+    pen = RecordingPointPen()
+    glyph.drawPoints(pen)
+    anchors = [_describeItem(anchor, ("name", "x", "y", "color", "identifier")) for anchor in glyph.anchors]
+    guidelines = _describeGuidelines(glyph.guidelines)
+    image = glyph.image
+    if image is not None and not isinstance(image, dict):
+        image = (image.fileName, image.transformation, image.color)
+    elif image is not None:
+        image = sorted(image.items())
+    return makeFingerprint((
+        glyph.width,
+        glyph.height,
+        list(glyph.unicodes or []),
+        pen.value,
+        anchors,
+        guidelines,
+        image,
+        glyph.note,
+        sorted(glyph.lib.items()),
+    ))
+
+
+def layerGlyphFingerprint(layer, glyphName):
+    """ Return a fingerprint of the glyph in this layer.
+        A defcon glyph that was not changed since it was read is not parsed,
+        the fingerprint is made from the .glif data.
+    """
+    if hasattr(layer, "naked"):
+        layer = layer.naked()
+    glyphSet = getattr(layer, "_glyphSet", None)
+    loadedGlyphs = getattr(layer, "_glyphs", None)
+    if glyphSet is not None and loadedGlyphs is not None and glyphName in glyphSet:
+        glyph = loadedGlyphs.get(glyphName)
+        if glyph is None or not glyph.dirty:
+            return "glif:" + hashlib.sha1(glyphSet.getGLIF(glyphName)).hexdigest()
+    return glyphFingerprint(layer[glyphName])
+
+
+def fontInfoFingerprint(info, attributes):
+    values = []
+    for attribute in sorted(attributes):
+        value = getattr(info, attribute, None)
+        if attribute == "guidelines" and value is not None:
+            value = _describeGuidelines(value)
+        values.append((attribute, value))
+    return makeFingerprint(values)
+
+
+def _describeItem(item, attributes):
+    # anchors and guidelines can be dicts or objects
+    if isinstance(item, dict):
+        return tuple(item.get(attribute) for attribute in attributes)
+    return tuple(getattr(item, attribute, None) for attribute in attributes)
+
+
+def _describeGuidelines(guidelines):
+    return [_describeItem(guideline, ("name", "x", "y", "angle", "color", "identifier")) for guideline in guidelines]
+
+
+def getFingerprintsPath(ufoPath):
+    return os.path.join(ufoPath, "data", fingerprintsDataName)
+
+
+def readFingerprints(ufoPath):
+    """ Return the fingerprints stored in the UFO at ufoPath, or None. """
+    path = getFingerprintsPath(ufoPath)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return plistlib.load(f)
+    except Exception:
+        return None
+
+
+def writeFingerprints(ufoPath, fingerprints):
+    path = getFingerprintsPath(ufoPath)
+    folder = os.path.dirname(path)
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(path, "wb") as f:
+        plistlib.dump(fingerprints, f)
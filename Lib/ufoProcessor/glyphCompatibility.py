@@ -0,0 +1,67 @@
+# coding: utf-8
+
+"""
+    Compare the structure of the sources of a glyph before interpolating.
+
+    The structure of a source glyph is the number of points in each contour,
+    the base glyphs of the components and the names of the anchors, after it
+    was converted to a MathGlyph. Sources with different contours or points
+    can not be interpolated. Components and anchors that do not match are
+    left out of the instance, so those are only reported.
+"""
+
+
+def getGlyphStructure(mathGlyph):
+    """ Return (contours, components, anchors) for this MathGlyph. """
+    contours = tuple(len(contour["points"]) for contour in mathGlyph.contours)
+    components = tuple(sorted(component["baseGlyph"] for component in mathGlyph.components))
+    anchors = tuple(sorted(anchor.get("name") or "" for anchor in mathGlyph.anchors))
+    return contours, components, anchors
+
+
+def compareGlyphStructures(structures):
+    """ structures: list of (sourceName, structure) for the sources of one glyph.
+        Return (problems, warnings), two lists of strings.
+        Problems mean the glyph can not be interpolated.
+    """
+    problems = []
+    warnings = []
+    if len(structures) < 2:
+        return problems, warnings
+    contourCounts = _groupSources(structures, lambda structure: len(structure[0]))
+    if len(contourCounts) > 1:
+        problems.append(f"contours: {_describeGroups(contourCounts)}")
+    else:
+        pointCounts = _groupSources(structures, lambda structure: structure[0])
+        if len(pointCounts) > 1:
+            problems.append(f"points: {_describeGroups(pointCounts)}")
+    components = _groupSources(structures, lambda structure: structure[1])
+    if len(components) > 1:
+        warnings.append(f"components: {_describeGroups(components)}")
+    anchors = _groupSources(structures, lambda structure: structure[2])
+    if len(anchors) > 1:
+        warnings.append(f"anchors: {_describeGroups(anchors)}")
+    return problems, warnings
+
+
+def _groupSources(structures, describe):
+    groups = {}
+    for sourceName, structure in structures:
+        groups.setdefault(describe(structure), []).append(sourceName)
+    return groups
+
+
+def _describeGroups(groups):
+    return ", ".join(f"{value} in {', '.join(str(name) for name in names)}" for value, names in groups.items())
+
+
+if __name__ == "__main__":
+    from fontMath.mathGlyph import MathGlyph
+    a = MathGlyph(None)
+    a.contours.append(dict(identifier=None, points=[("curve", (0, 0), False, None, None)] * 4))
+    b = MathGlyph(None)
+    b.contours.append(dict(identifier=None, points=[("curve", (0, 0), False, None, None)] * 3))
+    b.anchors.append(dict(name="top", x=0, y=0))
+    problems, warnings = compareGlyphStructures([("A", getGlyphStructure(a)), ("B", getGlyphStructure(b))])
+    assert problems == ["points: (4,) in A, (3,) in B"]
+    assert warnings == ["anchors: () in A, ('top',) in B"]
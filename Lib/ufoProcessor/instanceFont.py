@@ -0,0 +1,160 @@
+# coding: utf-8
+
+from fontTools.pens.recordingPen import RecordingPointPen
+from fontTools.ufoLib import fontInfoAttributesVersion3
+
+from ufoProcessor.streamingWriter import StreamingUFOWriter
+
+"""
+    Font and glyph objects to make an instance and save it once.
+
+    They have the parts of the defcon objects UFOOperator uses to make an
+    instance, without notifications, undo or reading from disk. Set
+    UFOOperator.instanceFontClass and instanceGlyphClass to use them for
+    makeInstance and generateUFOs. The sources are still opened with
+    UFOOperator.fontClass.
+"""
+
+
+class InstanceGlyph(object):
+
+    def __init__(self, name=None):
+        self.name = name
+        self.width = 0
+        self.height = 0
+        self.unicodes = []
+        self.note = None
+        self.image = None
+        self.anchors = []
+        self.guidelines = []
+        self.lib = {}
+        self._contours = RecordingPointPen()
+        self._components = RecordingPointPen()
+
+    def __repr__(self):
+        return f"<InstanceGlyph {self.name}>"
+
+    def clear(self):
+        self.clearContours()
+        self.clearComponents()
+        self.clearAnchors()
+        self.clearGuidelines()
+        self.image = None
+
+    def clearContours(self):
+        self._contours = RecordingPointPen()
+
+    def clearComponents(self):
+        self._components = RecordingPointPen()
+
+    def clearAnchors(self):
+        self.anchors = []
+
+    def clearGuidelines(self):
+        self.guidelines = []
+
+    def getPointPen(self):
+        return _InstanceGlyphPointPen(self)
+
+    def drawPoints(self, pointPen):
+        # contours first, then components, the same as defcon
+        self._contours.replay(pointPen)
+        self._components.replay(pointPen)
+
+
+class _InstanceGlyphPointPen(object):
+    # record contours and components separately, so they can be cleared separately
+
+    def __init__(self, glyph):
+        self.glyph = glyph
+
+    def beginPath(self, identifier=None, **kwargs):
+        self.glyph._contours.beginPath(identifier=identifier, **kwargs)
+
+    def addPoint(self, pt, segmentType=None, smooth=False, name=None, identifier=None, **kwargs):
+        self.glyph._contours.addPoint(pt, segmentType=segmentType, smooth=smooth, name=name, identifier=identifier, **kwargs)
+
+    def endPath(self):
+        self.glyph._contours.endPath()
+
+    def addComponent(self, baseGlyphName, transformation, identifier=None, **kwargs):
+        self.glyph._components.addComponent(baseGlyphName, transformation, identifier=identifier, **kwargs)
+
+
+class InstanceInfo(object):
+
+    def __init__(self):
+        for attribute in fontInfoAttributesVersion3:
+            setattr(self, attribute, None)
+        # defcon writes the empty list too
+        self.guidelines = []
+
+
+class InstanceFeatures(object):
+
+    def __init__(self):
+        self.text = None
+
+
+class InstanceFont(object):
+
+    glyphClass = InstanceGlyph
+
+    def __init__(self, path=None, **kwargs):
+        # the keyword arguments are the object classes UFOOperator gives a defcon font
+        if path is not None:
+            raise ValueError("InstanceFont can not read a UFO, use it for new instances only")
+        self.path = None
+        self.info = InstanceInfo()
+        self.kerning = {}
+        self.groups = {}
+        self.lib = {}
+        self.features = InstanceFeatures()
+        self._glyphs = {}
+
+    def __repr__(self):
+        return f"<InstanceFont {self.info.familyName} {self.info.styleName}>"
+
+    def __len__(self):
+        return len(self._glyphs)
+
+    def __contains__(self, glyphName):
+        return glyphName in self._glyphs
+
+    def __iter__(self):
+        return iter(self._glyphs.values())
+
+    def __getitem__(self, glyphName):
+        return self._glyphs[glyphName]
+
+    def __delitem__(self, glyphName):
+        del self._glyphs[glyphName]
+        glyphOrder = self.lib.get("public.glyphOrder")
+        if glyphOrder is not None and glyphName in glyphOrder:
+            self.lib["public.glyphOrder"] = [name for name in glyphOrder if name != glyphName]
+
+    def keys(self):
+        return self._glyphs.keys()
+
+    def newGlyph(self, glyphName):
+        glyph = self.glyphClass(glyphName)
+        self._glyphs[glyphName] = glyph
+        # a new glyph is added to the end of the glyph order, the same as defcon.
+        # the list can be shared with the operator or a source lib, so it is replaced, not changed.
+        glyphOrder = self.lib.get("public.glyphOrder", [])
+        if glyphName not in glyphOrder:
+            self.lib["public.glyphOrder"] = list(glyphOrder) + [glyphName]
+        return glyph
+
+    def save(self, path):
+        """ Write the font as a UFO at path, replace the UFO that is there. """
+        writer = StreamingUFOWriter(path)
+        try:
+            # in the same order as defcon
+            for glyphName in sorted(self._glyphs):
+                writer.writeGlyph(self._glyphs[glyphName])
+        except Exception:
+            writer.abort()
+            raise
+        writer.close(self)
+        self.path = path
@@ -0,0 +1,85 @@
+# coding: utf-8
+
+from fontMath.mathKerning import side1Prefix, side2Prefix
+
+"""
+    Look up single kerning pairs in a source, without making a MathKerning.
+
+    UFOOperator keeps one KerningGroupIndex for each group of sources with
+    the same kerning groups in a discrete location, and one KerningPairIndex
+    for each source. They are made once, after that a pair costs a few dict
+    lookups. The value for a pair is the same as MathKerning.get().
+    UFOOperator.kerningChanged() removes the indexes.
+"""
+
+
+def getKerningGroups(groups):
+    """ Return {group name: list of glyph names} for the kern1 and kern2 groups in groups. """
+    return {groupName: list(glyphList) for groupName, glyphList in groups.items() if groupName.startswith(side1Prefix) or groupName.startswith(side2Prefix)}
+
+
+class KerningGroupIndex(object):
+
+    def __init__(self, groups):
+        self.groups = getKerningGroups(groups)
+        self.side1GroupMap = {}    # glyph name: kern1 group name
+        self.side2GroupMap = {}    # glyph name: kern2 group name
+        for groupName, glyphList in self.groups.items():
+            if groupName.startswith(side1Prefix):
+                for glyphName in glyphList:
+                    self.side1GroupMap[glyphName] = groupName
+            else:
+                for glyphName in glyphList:
+                    self.side2GroupMap[glyphName] = groupName
+
+    def getGroups(self):
+        """ Return a copy of the kerning groups, the same as MathKerning.groups(). """
+        return {groupName: list(glyphList) for groupName, glyphList in self.groups.items()}
+
+
+class KerningPairIndex(object):
+
+    def __init__(self, kerning, groupIndex):
+        self.kerning = dict(kerning)
+        self.groupIndex = groupIndex
+
+    def __len__(self):
+        return len(self.kerning)
+
+    def get(self, pair):
+        """ Return the value for pair: the pair itself, or a group pair or exception for it, or 0. """
+        kerning = self.kerning
+        if pair in kerning:
+            return kerning[pair]
+        side1, side2 = pair
+        if side1.startswith(side1Prefix):
+            side1Group = side1
+            side1 = None
+        else:
+            side1Group = self.groupIndex.side1GroupMap.get(side1)
+        if side2.startswith(side2Prefix):
+            side2Group = side2
+            side2 = None
+        else:
+            side2Group = self.groupIndex.side2GroupMap.get(side2)
+        # the same order as MathKerning
+        for found in ((side1Group, side2), (side1, side2Group), (side1Group, side2Group)):
+            if found in kerning:
+                return kerning[found]
+        return 0
+
+    def getPairs(self, pairs):
+        """ Return {pair: value} for these pairs. """
+        return {pair: self.get(pair) for pair in pairs}
+
+
+if __name__ == "__main__":
+    from fontMath.mathKerning import MathKerning
+    groups = {"public.kern1.O": ["O", "D"], "public.kern2.O": ["O", "C"]}
+    kerning = {("public.kern1.O", "public.kern2.O"): -10, ("D", "public.kern2.O"): -20, ("public.kern1.O", "C"): 5, ("T", "a"): -50}
+    groupIndex = KerningGroupIndex(dict(groups, other=["O"]))
+    index = KerningPairIndex(kerning, groupIndex)
+    mathKerning = MathKerning(kerning, groups)
+    assert groupIndex.getGroups() == mathKerning.groups()
+    for pair in [("O", "O"), ("D", "C"), ("D", "O"), ("O", "C"), ("T", "a"), ("T", "O"), ("public.kern1.O", "O")]:
+        assert index.get(pair) == mathKerning.get(pair), pair
@@ -0,0 +1,96 @@
+# coding: utf-8
+
+import weakref
+import collections.abc
+
+from fontTools.ufoLib import UFOReader
+
+"""
+    Open the source fonts only when they are needed.
+
+    UFOOperator.loadFonts(lazy=True) only reads metainfo.plist, layercontents.plist
+    and the contents.plist of the default layer of each source, to know the glyph
+    names. The font object is made the first time the source is asked for, and
+    the font object reads each glyph when it is first asked for.
+"""
+
+
+def readSourceSummary(path):
+    """ Return (glyph names, UFO format version, default layer name) for the UFO at path,
+        without making a font object.
+    """
+    with UFOReader(path, validate=False) as reader:
+        defaultLayerName = reader.getDefaultLayerName()
+        glyphSet = reader.getGlyphSet(defaultLayerName, validateRead=False, validateWrite=False)
+        return list(glyphSet.keys()), reader.formatVersionTuple[0], defaultLayerName
+
+
+class LazyFontMapping(collections.abc.MutableMapping):
+    """ A dict of source name: font object. A source that was added with
+        addPath is opened the first time it is asked for.
+    """
+
+    def __init__(self, openFunction, fonts=None):
+        # openFunction: bound method that makes a font object from a path, only weakly referenced
+        self._openFunction = weakref.WeakMethod(openFunction)
+        self._names = {}    # all names, in the order they were added
+        self._fonts = {}
+        self._paths = {}
+        self._defaultLayerNames = {}
+        if fonts is not None:
+            for name, font in fonts.items():
+                self[name] = font
+
+    def addPath(self, name, path, defaultLayerName=None):
+        self._fonts.pop(name, None)
+        self._names[name] = None
+        self._paths[name] = path
+        self._defaultLayerNames[name] = defaultLayerName
+
+    def isOpen(self, name):
+        return name in self._fonts
+
+    def getPath(self, name):
+        if name in self._paths:
+            return self._paths[name]
+        font = self._fonts[name]
+        if font is None:
+            return None
+        return font.path
+
+    def getDefaultLayerName(self, name):
+        # only for sources that are not open yet
+        return self._defaultLayerNames.get(name)
+
+    def __getitem__(self, name):
+        if name not in self._fonts:
+            path = self._paths[name]
+            self._fonts[name] = self._openFunction()(path)
+            del self._paths[name]
+        return self._fonts[name]
+
+    def __setitem__(self, name, font):
+        self._paths.pop(name, None)
+        self._defaultLayerNames.pop(name, None)
+        self._names[name] = None
+        self._fonts[name] = font
+
+    def __delitem__(self, name):
+        if name in self._paths:
+            del self._paths[name]
+            self._defaultLayerNames.pop(name, None)
+        else:
+            del self._fonts[name]
+        del self._names[name]
+
+    def __contains__(self, name):
+        return name in self._fonts or name in self._paths
+
+    def __iter__(self):
+        return iter(list(self._names))
+
+    def __len__(self):
+        return len(self._names)
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} {len(self._fonts)} open, {len(self._paths)} not open>"
@@ -0,0 +1,331 @@
+# coding: utf-8
+
+import sys
+import types
+import weakref
+import collections
+
+"""
+    A cache for the results of memoized UFOOperator methods.
+
+    Each UFOOperator owns one MemoizeCache. The cache only keeps a weak
+    reference to its owner, so an operator can be collected while its
+    cache is still populated. The cache can be bounded by the number of
+    entries and / or an estimate of the number of bytes the entries use.
+
+    Entries are indexed by function name, glyph name and discrete location,
+    so all entries for one glyph can be found without looking at the others.
+
+    Eviction policies:
+        "lru": remove the least recently used entries first.
+        "cost": look at the oldest entries and remove the one that
+            costs the most bytes per hit first.
+"""
+
+_allCaches = weakref.WeakSet()
+
+_missing = object()
+
+_skipTypes = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType, weakref.ref)
+
+
+def freezeLocation(location):
+    # a hashable version of a (discrete) location dict
+    if location is None:
+        return None
+    return tuple(sorted(location.items()))
+
+
+def estimateSize(obj):
+    """ Return a rough estimate of the number of bytes used by obj
+        and all the objects it refers to.
+    """
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _skipTypes):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, int, float, bool)) or item is None:
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        if hasattr(item, "__dict__"):
+            stack.append(item.__dict__)
+        for slotName in getattr(type(item), "__slots__", ()):
+            value = getattr(item, slotName, None)
+            if value is not None:
+                stack.append(value)
+    return size
+
+
+class MemoizeCache(object):
+
+    def __init__(self, owner, maxEntries=None, maxBytes=None, policy="lru", sizeFunction=estimateSize):
+        # owner: the object whose methods are memoized, only weakly referenced
+        # maxEntries: maximum number of entries, None for no limit
+        # maxBytes: maximum estimated size of all entries, None for no limit
+        # policy: "lru" or "cost"
+        # sizeFunction: callable that estimates the size of a cached value
+        self._owner = weakref.ref(owner)
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.policy = policy
+        self.sizeFunction = sizeFunction
+        self.costSampleSize = 8
+        self._entries = collections.OrderedDict()
+        self._costs = {}
+        self._stats = {}
+        self._tags = {}
+        self._byFunctionName = collections.defaultdict(set)
+        self._byGlyphName = collections.defaultdict(set)
+        self._byDiscreteLocation = collections.defaultdict(set)
+        self.totalBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _allCaches.add(self)
+
+    @property
+    def owner(self):
+        return self._owner()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(list(self._entries.keys()))
+
+    def keys(self):
+        return list(self._entries.keys())
+
+    def get(self, key, default=None):
+        """ Return the cached value for key and count the hit, or default. """
+        value = self._entries.get(key, _missing)
+        if value is _missing:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self._stats[key] += 1
+        self.hits += 1
+        return value
+
+    def set(self, key, value, glyphName=None, discreteLocation=None):
+        """ Store value for key, then evict entries until the cache fits its limits again.
+            key[0] is the function name. glyphName and discreteLocation are indexed.
+        """
+        if key in self._entries:
+            self.remove(key)
+        cost = 0
+        if self.maxBytes is not None:
+            cost = self.sizeFunction(value)
+        self._entries[key] = value
+        self._costs[key] = cost
+        self._stats[key] = 1
+        discreteKey = freezeLocation(discreteLocation)
+        self._tags[key] = (key[0], glyphName, discreteKey)
+        self._byFunctionName[key[0]].add(key)
+        if glyphName is not None:
+            self._byGlyphName[glyphName].add(key)
+        self._byDiscreteLocation[discreteKey].add(key)
+        self.totalBytes += cost
+        self._evict(keep=key)
+
+    def remove(self, key):
+        if key not in self._entries:
+            return
+        del self._entries[key]
+        self.totalBytes -= self._costs.pop(key, 0)
+        self._stats.pop(key, None)
+        functionName, glyphName, discreteKey = self._tags.pop(key)
+        self._discard(self._byFunctionName, functionName, key)
+        if glyphName is not None:
+            self._discard(self._byGlyphName, glyphName, key)
+        self._discard(self._byDiscreteLocation, discreteKey, key)
+
+    def _discard(self, index, indexKey, key):
+        keys = index.get(indexKey)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del index[indexKey]
+
+    def clear(self):
+        self._entries.clear()
+        self._costs.clear()
+        self._stats.clear()
+        self._tags.clear()
+        self._byFunctionName.clear()
+        self._byGlyphName.clear()
+        self._byDiscreteLocation.clear()
+        self.totalBytes = 0
+
+    # indexed access
+
+    def keysForFunctionName(self, functionName):
+        return list(self._byFunctionName.get(functionName, ()))
+
+    def keysForGlyphName(self, glyphName):
+        return list(self._byGlyphName.get(glyphName, ()))
+
+    def keysForDiscreteLocation(self, discreteLocation):
+        return list(self._byDiscreteLocation.get(freezeLocation(discreteLocation), ()))
+
+    def glyphNames(self):
+        """ Return the names of all glyphs that have entries in the cache. """
+        return list(self._byGlyphName.keys())
+
+    def removeGlyphNames(self, glyphNames, discreteLocation=_missing):
+        """ Remove all entries for these glyphs.
+            Optionally only the entries for one discrete location.
+        """
+        for glyphName in glyphNames:
+            keys = self.keysForGlyphName(glyphName)
+            if discreteLocation is not _missing:
+                discreteKey = freezeLocation(discreteLocation)
+                keys = [key for key in keys if self._tags[key][2] == discreteKey]
+            for key in keys:
+                self.remove(key)
+
+    def removeFunctionName(self, functionName):
+        for key in self.keysForFunctionName(functionName):
+            self.remove(key)
+
+    def removeDiscreteLocation(self, discreteLocation):
+        for key in self.keysForDiscreteLocation(discreteLocation):
+            self.remove(key)
+
+    def _isFull(self):
+        if self.maxEntries is not None and len(self._entries) > self.maxEntries:
+            return True
+        if self.maxBytes is not None and self.totalBytes > self.maxBytes:
+            return True
+        return False
+
+    def _evict(self, keep=None):
+        # never evict the entry that was just added,
+        # even if it does not fit by itself.
+        while self._isFull() and len(self._entries) > 1:
+            victim = self._findVictim(keep)
+            if victim is None:
+                break
+            self.remove(victim)
+            self.evictions += 1
+
+    def _findVictim(self, keep):
+        candidates = []
+        for key in self._entries:
+            if key == keep:
+                continue
+            candidates.append(key)
+            if self.policy != "cost" or len(candidates) >= self.costSampleSize:
+                break
+        if not candidates:
+            return None
+        if self.policy == "cost":
+            # the most bytes for the fewest hits goes first
+            candidates.sort(key=lambda k: self._costs[k] / self._stats[k], reverse=True)
+        return candidates[0]
+
+    def getStatistics(self):
+        return dict(
+            entries=len(self._entries),
+            bytes=self.totalBytes,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+        )
+
+    def _describeKey(self, key):
+        owner = self.owner
+        if key[0] == "getGlyphMutator":
+            return f"{id(owner):X} {key[0]}: {key[1][0][0]}"
+        return f"{id(owner):X} {key[0]}"
+
+    def inspect(self):
+        """ Return a list of (function, number of entries) and a list of (function, number of calls) """
+        objects = {}
+        frequency = []
+        for key in self._entries:
+            functionName = self._describeKey(key)
+            if functionName not in objects:
+                objects[functionName] = 0
+            objects[functionName] += 1
+        items = [(k, v) for k, v in objects.items()]
+        for key, called in self._stats.items():
+            frequency.append((self._describeKey(key), called))
+        frequency.sort()
+        return items, frequency
+
+
+def inspectAllCaches():
+    # collect the inspection results of all live caches
+    items = []
+    frequency = []
+    for cache in list(_allCaches):
+        cacheItems, cacheFrequency = cache.inspect()
+        items.extend(cacheItems)
+        frequency.extend(cacheFrequency)
+    frequency.sort()
+    return items, frequency
+
+
+if __name__ == "__main__":
+    class Owner(object):
+        pass
+
+    owner = Owner()
+    cache = MemoizeCache(owner, maxEntries=2)
+    cache.set(("a", (1,), ()), "one")
+    cache.set(("b", (2,), ()), "two")
+    assert cache.get(("a", (1,), ())) == "one"
+    cache.set(("c", (3,), ()), "three")
+    # b was least recently used
+    assert ("b", (2,), ()) not in cache
+    assert len(cache) == 2
+    assert cache.evictions == 1
+
+    cache = MemoizeCache(owner, maxBytes=1000)
+    cache.set(("big", (), ()), "x" * 800)
+    cache.set(("small", (), ()), "y")
+    assert ("small", (), ()) in cache
+    cache.set(("other", (), ()), "z" * 800)
+    assert ("big", (), ()) not in cache
+    assert cache.totalBytes <= 1000
+
+    cache = MemoizeCache(owner, maxEntries=2, maxBytes=10000, policy="cost")
+    cache.set(("big", (), ()), "x" * 800)
+    cache.set(("small", (), ()), "y")
+    cache.set(("small2", (), ()), "z")
+    # the oldest entry is not the most expensive one
+    assert ("big", (), ()) not in cache
+    assert ("small", (), ()) in cache
+
+    cache = MemoizeCache(owner)
+    cache.set(("getGlyphMutator", (("a",),), ()), 1, glyphName="a", discreteLocation=dict(x=1))
+    cache.set(("getGlyphMutator", (("a",),), ("x", (2,))), 2, glyphName="a", discreteLocation=dict(x=2))
+    cache.set(("getGlyphMutator", (("b",),), ()), 3, glyphName="b", discreteLocation=dict(x=1))
+    cache.set(("getInfoMutator", (), ()), 4)
+    assert sorted(cache.glyphNames()) == ["a", "b"]
+    assert len(cache.keysForDiscreteLocation(dict(x=1))) == 2
+    cache.removeGlyphNames(["a"], discreteLocation=dict(x=2))
+    assert len(cache.keysForGlyphName("a")) == 1
+    cache.removeGlyphNames(["a"])
+    assert cache.glyphNames() == ["b"]
+    assert len(cache) == 2
+    cache.removeFunctionName("getInfoMutator")
+    assert len(cache) == 1
+
+    # the cache does not keep its owner alive
+    del owner
+    assert cache.owner is None
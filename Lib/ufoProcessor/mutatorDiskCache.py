@@ -0,0 +1,75 @@
+# coding: utf-8
+
+import os
+import pickle
+import tempfile
+
+"""
+    A cache for mutators on disk, so they can be reused by the next run.
+
+    The cache is a folder with one pickle file for each key. The key is a
+    fingerprint of everything the mutator is made from: the source data, the
+    axes and the settings of the operator. A changed source makes a new key,
+    old files are never updated, only added. Remove the folder to start over.
+"""
+
+mutatorCacheFormatVersion = 3
+
+
+class MutatorDiskCache(object):
+
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _getFilePath(self, key):
+        return os.path.join(self.path, key[:2], f"{key}.pickle")
+
+    def __contains__(self, key):
+        return os.path.exists(self._getFilePath(key))
+
+    def get(self, key, default=None):
+        """ Return the value stored for key, or default. Unreadable files count as missing. """
+        try:
+            with open(self._getFilePath(key), "rb") as f:
+                value = pickle.load(f)
+        except Exception:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """ Store value for key. Return False if the value could not be stored. """
+        # write to a temporary file first so other processes never read half a file
+        filePath = self._getFilePath(key)
+        folder = os.path.dirname(filePath)
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            os.makedirs(folder, exist_ok=True)
+            handle, tempPath = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        except Exception:
+            return False
+        try:
+            with os.fdopen(handle, "wb") as f:
+                f.write(data)
+            os.replace(tempPath, filePath)
+        except OSError:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            return False
+        self.writes += 1
+        return True
+
+    def clear(self):
+        if not os.path.exists(self.path):
+            return
+        for folder, folderNames, fileNames in os.walk(self.path):
+            for fileName in fileNames:
+                if fileName.endswith(".pickle"):
+                    os.remove(os.path.join(folder, fileName))
+
+    def getStatistics(self):
+        return dict(hits=self.hits, misses=self.misses, writes=self.writes)
@@ -0,0 +1,60 @@
+# coding: utf-8
+
+import os
+import shutil
+import tempfile
+
+from fontTools.ufoLib import UFOWriter
+
+"""
+    Write an instance UFO while it is made.
+
+    UFOOperator.generateUFOs(streaming=True) writes each glyph as soon as
+    it is interpolated, so the glyphs of the instance are never all in
+    memory. The info, groups, kerning, lib and features are written when
+    the instance is closed. The UFO is written to a temporary folder next
+    to the path and moved in place at the end, the same as defcon does
+    when a font is saved over an existing UFO.
+"""
+
+
+class StreamingUFOWriter(object):
+
+    def __init__(self, path):
+        self.path = path
+        self._tempFolder = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)))
+        self._tempPath = os.path.join(self._tempFolder, os.path.basename(path))
+        self.writer = UFOWriter(self._tempPath)
+        self.glyphSet = self.writer.getGlyphSet(defaultLayer=True)
+        self.glyphCount = 0
+
+    def writeGlyph(self, glyph):
+        """ Write this glyph, a defcon or fontParts glyph object. """
+        self.glyphSet.writeGlyph(glyph.name, glyph, glyph.drawPoints)
+        self.glyphCount += 1
+
+    def close(self, font):
+        """ Write the info, groups, kerning, lib and features of font, then move the UFO to path. """
+        try:
+            self.writer.writeInfo(font.info)
+            self.writer.writeGroups(font.groups)
+            self.writer.writeKerning(font.kerning)
+            self.writer.writeLib(dict(font.lib))
+            if font.features.text is not None:
+                self.writer.writeFeatures(font.features.text)
+            self.glyphSet.writeContents()
+            self.writer.writeLayerContents()
+            self.writer.close()
+            self.writer.setModificationTime()
+            if os.path.isfile(self.path):
+                os.remove(self.path)
+            elif os.path.isdir(self.path):
+                shutil.rmtree(self.path)
+            shutil.move(self._tempPath, self.path)
+        finally:
+            shutil.rmtree(self._tempFolder, ignore_errors=True)
+
+    def abort(self):
+        """ Remove what was written, leave path as it was. """
+        self.writer.close()
+        shutil.rmtree(self._tempFolder, ignore_errors=True)
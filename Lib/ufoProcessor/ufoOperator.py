@@ -1,6 +1,10 @@
 import os
 import functools
 import itertools
+import inspect
+import concurrent.futures
+import fontTools
+import fontMath
 
 import random
 import defcon
@@ -11,6 +15,7 @@ import traceback
 from fontTools.designspaceLib import DesignSpaceDocument, processRules
 from fontTools.ufoLib import fontInfoAttributesVersion1, fontInfoAttributesVersion2, fontInfoAttributesVersion3
 from fontTools.misc import plistlib
+from fontTools.misc.transform import Transform
 
 from fontMath.mathGlyph import MathGlyph
 from fontMath.mathInfo import MathInfo
@@ -21,11 +26,18 @@ from mutatorMath.objects.location import Location
 import fontParts.fontshell.font
 
 from ufoProcessor.varModels import VariationModelMutator
-from ufoProcessor.emptyPen import checkGlyphIsEmpty, DecomposePointPen
+from ufoProcessor.emptyPen import checkGlyphIsEmpty, DecomposedOutlineCache
 from ufoProcessor.logger import Logger
+from ufoProcessor.memoizeCache import MemoizeCache, inspectAllCaches, freezeLocation
+from ufoProcessor.fingerprints import makeFingerprint, glyphFingerprint, layerGlyphFingerprint, fontInfoFingerprint, readFingerprints, writeFingerprints
+from ufoProcessor.mutatorDiskCache import MutatorDiskCache, mutatorCacheFormatVersion
+from ufoProcessor.lazyFonts import LazyFontMapping, readSourceSummary
+from ufoProcessor.componentGraph import ComponentGraph, getComponentReferences
+from ufoProcessor.glyphCompatibility import getGlyphStructure, compareGlyphStructures
+from ufoProcessor.kerningIndex import KerningGroupIndex, KerningPairIndex, getKerningGroups
+from ufoProcessor.streamingWriter import StreamingUFOWriter
 
-_memoizeCache = dict()
-_memoizeStats = dict()
+_missing = object()
 
 
 def ip(a, b, f):
@@ -47,47 +59,40 @@ def immutify(obj):
         hashValues.append(obj)
     return tuple(hashValues)
 
+def _findArgument(name, parameterNames, args, kwargs):
+    # find the value for this argument, positional or keyword
+    if name in kwargs:
+        return kwargs[name]
+    if name in parameterNames:
+        index = parameterNames.index(name)
+        if index < len(args):
+            return args[index]
+    return None
+
 def memoize(function):
+    # results are stored in the memoizeCache of the object itself.
+    # the object is not part of the key, so the cache does not keep it alive.
+    # glyphName and discreteLocation arguments are indexed by the cache
+    parameterNames = [p.name for p in inspect.signature(function).parameters.values() if p.kind == p.POSITIONAL_OR_KEYWORD][1:]
     @functools.wraps(function)
     def wrapper(self, *args, **kwargs):
         immutableargs = immutify(args)
         immutablekwargs = immutify(kwargs)
-        key = (function.__name__, self, immutableargs, immutablekwargs)
-        if key in _memoizeCache:
-            # keep track of how often we get to serve something from the cache
-            # note: if the object itself is part of the key
-            # keeping these stats will keep the object around
-            _memoizeStats[key] += 1
-            return _memoizeCache[key]
-        else:
+        key = (function.__name__, immutableargs, immutablekwargs)
+        cache = self.memoizeCache
+        result = cache.get(key, _missing)
+        if result is _missing:
             result = function(self, *args, **kwargs)
-            _memoizeCache[key] = result
-            _memoizeStats[key] = 1
-            return result
+            cache.set(key, result,
+                glyphName=_findArgument("glyphName", parameterNames, args, kwargs),
+                discreteLocation=_findArgument("discreteLocation", parameterNames, args, kwargs),
+                )
+        return result
     return wrapper
 
 def inspectMemoizeCache():
-    frequency = []
-    objects = {}
-    items = []
-    for key, value in _memoizeCache.items():
-        if key[0] == "getGlyphMutator":
-            functionName = f"{id(key[1]):X} {key[0]}: {key[2][0][0]}"
-        else:
-            functionName = f"{id(key[1]):X} {key[0]}"
-        if functionName not in objects:
-            objects[functionName] = 0
-        objects[functionName] += 1
-    items = [(k, v) for k, v in objects.items()]
-    for key in _memoizeStats.keys():
-        if key[0] == "getGlyphMutator":
-            functionName = f"{id(key[1]):X} {key[0]}: {key[2][0][0]}"
-        else:
-            functionName = f"{id(key[1]):X} {key[0]}"
-        called = _memoizeStats[key]
-        frequency.append((functionName, called))
-    frequency.sort()
-    return items, frequency
+    # report on the caches of all UFOOperator objects that are alive
+    return inspectAllCaches()
 
 def getUFOVersion(ufoPath):
     # Peek into a ufo to read its format version.
@@ -145,12 +150,31 @@ class UFOOperator(object):
     mathGlyphClass = MathGlyph
     mathKerningClass = MathKerning
 
+    # the font and glyph objects for new instances, None to use fontClass and glyphClass.
+    # instanceFont.InstanceFont and InstanceGlyph are lighter, but can not read a UFO.
+    instanceFontClass = None
+    instanceGlyphClass = None
+
     def __init__(self, pathOrObject=None, ufoVersion=3, useVarlib=True, extrapolate=False, strict=False, debug=False):
+        # the cache can be bounded with self.memoizeCache.maxEntries and self.memoizeCache.maxBytes
+        self.memoizeCache = MemoizeCache(self)
+        # the results of makeOneGlyph, None to calculate every glyph again
+        self.glyphResultCache = MemoizeCache(self, maxEntries=1000)
+        self.glyphResultDigits = 3    # with the glyphResultCache, makeOneGlyph rounds the location to this many digits
+        self._variationModels = {}    # master locations: VariationModel
         self.ufoVersion = ufoVersion
         self.useVarlib = useVarlib
         self._fontsLoaded = False
         self.fonts = {}
         self.roundGeometry = False
+        self.useNumpy = False    # interpolate compatible glyphs with numpy, if it is available
+        self.mutatorCachePath = None    # folder to keep the mutators between runs, None for no disk cache
+        self._mutatorDiskCache = None
+        self._incompatibleGlyphs = None    # discrete location: {glyphName: unicodes}, made by checkGlyphCompatibility
+        self._componentGraphs = {}    # discrete location: ComponentGraph
+        self._decomposedOutlines = DecomposedOutlineCache()    # for decomposeComponents=True
+        self._kerningGroupIndexes = {}    # discrete location: {source name: (font, KerningGroupIndex)}
+        self._kerningPairIndexes = {}    # source name: (font, KerningPairIndex), for kerning with pairs
         self.mutedAxisNames = None    # list of axisname that need to be muted
         self.strict = strict
         self.debug = debug
@@ -198,6 +222,18 @@ class UFOOperator(object):
             # if our fontClass doesnt support all the additional classes
             return self.fontClass(path)
 
+    def _newInstanceFont(self):
+        # a new font object for an instance
+        if self.instanceFontClass is None:
+            return self._instantiateFont(None)
+        return self.instanceFontClass()
+
+    def _newInstanceGlyph(self, glyphName):
+        # a new glyph object for an instance, without a font
+        glyph = (self.instanceGlyphClass or self.glyphClass)()
+        glyph.name = glyphName
+        return glyph
+
     # UFOProcessor compatibility
     # not sure whether to expose all the DesignSpaceDocument internals here
     # One can just use ufoOperator.doc to get it going?
@@ -318,29 +354,45 @@ class UFOOperator(object):
         return self.doc.getAxis(axisName)
 
     # loading and updating fonts
-    def loadFonts(self, reload=False):
-        # Load the fonts and find the default candidate based on the info flag
+    def loadFonts(self, reload=False, lazy=False, workers=None):
+        """ Load the fonts and find the default candidate based on the info flag
+            lazy: only read the glyph names of the sources now.
+                Each source is opened when it is first needed, and its glyphs when they are first needed.
+            workers: number of threads to read the sources with.
+                None or 1: read the sources one after the other.
+        """
         if self._fontsLoaded and not reload:
             if self.debug:
                 self.logger.info("\t\t-- loadFonts requested, but fonts are loaded already and no reload requested")
             return
+        if lazy and not isinstance(self.fonts, LazyFontMapping):
+            self.fonts = LazyFontMapping(self._instantiateFont, self.fonts)
         names = set()
         actions = []
         if self.debug:
             self.logger.info("## loadFonts")
+        sourcesToRead = {}
         for i, sourceDescriptor in enumerate(self.doc.sources):
             if sourceDescriptor.name is None:
                 # make sure it has a unique name
                 sourceDescriptor.name = "source.%d" % i
-            if sourceDescriptor.name not in self.fonts:
-                if os.path.exists(sourceDescriptor.path):
-                    f = self.fonts[sourceDescriptor.name] = self._instantiateFont(sourceDescriptor.path)
-                    thisLayerName = getDefaultLayerName(f)
-                    actions.append(f"loaded: {os.path.basename(sourceDescriptor.path)}, layer: {thisLayerName}, format: {getUFOVersion(sourceDescriptor.path)}, id: {id(f):X}")
-                    names |= set(self.fonts[sourceDescriptor.name].keys())
-                else:
-                    self.fonts[sourceDescriptor.name] = None
-                    actions.append("source ufo not found at %s" % (sourceDescriptor.path))
+            if sourceDescriptor.name not in self.fonts and sourceDescriptor.name not in sourcesToRead:
+                sourcesToRead[sourceDescriptor.name] = sourceDescriptor
+        readResults = self._readSources(list(sourcesToRead.values()), lazy, workers)
+        for sourceDescriptor, result in zip(sourcesToRead.values(), readResults):
+            if result is None:
+                self.fonts[sourceDescriptor.name] = None
+                actions.append("source ufo not found at %s" % (sourceDescriptor.path))
+            elif lazy:
+                glyphNames, formatVersion, thisLayerName = result
+                self.fonts.addPath(sourceDescriptor.name, sourceDescriptor.path, thisLayerName)
+                actions.append(f"found: {os.path.basename(sourceDescriptor.path)}, layer: {thisLayerName}, format: {formatVersion}, opened when needed")
+                names |= set(glyphNames)
+            else:
+                f = self.fonts[sourceDescriptor.name] = result
+                thisLayerName = getDefaultLayerName(f)
+                actions.append(f"loaded: {os.path.basename(sourceDescriptor.path)}, layer: {thisLayerName}, format: {getUFOVersion(sourceDescriptor.path)}, id: {id(f):X}")
+                names |= set(self.fonts[sourceDescriptor.name].keys())
         self.glyphNames = list(names)
         if self.debug:
             for item in actions:
@@ -348,6 +400,21 @@ class UFOOperator(object):
         self._fontsLoaded = True
         # XX maybe also make a character map here?
 
+    def _readSources(self, sourceDescriptors, lazy=False, workers=None):
+        # return a font object, or the summary of the source if lazy, for each source.
+        # None for sources that do not exist.
+        # Reading is mostly waiting for the disk, so threads are good enough.
+        def readSource(sourceDescriptor):
+            if not os.path.exists(sourceDescriptor.path):
+                return None
+            if lazy:
+                return readSourceSummary(sourceDescriptor.path)
+            return self._instantiateFont(sourceDescriptor.path)
+        if workers is None or workers < 2 or len(sourceDescriptors) < 2:
+            return [readSource(sourceDescriptor) for sourceDescriptor in sourceDescriptors]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(readSource, sourceDescriptors))
+
     def _logLoadedFonts(self):
         # dump info about the loaded fonts to the log
         items = []
@@ -413,57 +480,104 @@ class UFOOperator(object):
 
     def changed(self):
         # clears everything relating to this designspacedocument
-        # the cache could contain more designspacedocument objects.
-        for key in list(_memoizeCache.keys()):
-            if key[1] == self:
-                del _memoizeCache[key]
-                if key in _memoizeStats:
-                    del _memoizeStats[key]
+        self.memoizeCache.clear()
+        if self.glyphResultCache is not None:
+            self.glyphResultCache.clear()
+        self._variationModels.clear()
+        self._incompatibleGlyphs = None
+        self._componentGraphs.clear()
+        self._decomposedOutlines.clear()
+        self._kerningGroupIndexes.clear()
+        self._kerningPairIndexes.clear()
+
+    def kerningChanged(self):
+        """ Call this after the kerning or the groups of a source changed. """
+        self._kerningGroupIndexes.clear()
+        self._kerningPairIndexes.clear()
+        self.memoizeCache.removeFunctionName("getKerningMutator")
 
     def glyphChanged(self, glyphName, includeDependencies=False):
         """Clears this one specific glyph from the memoize cache
         includeDependencies = True: check where glyphName is used as a component
-            and remove those as well.
-            Note: this must be check in each discreteLocation separately
-            because they can have different constructions."""
+            and remove those as well, in all discrete locations."""
         changedNames = set()
         changedNames.add(glyphName)
-        
+        self._updateComponentGraphs(glyphName)
         if includeDependencies:
             dependencies = self.getGlyphDependencies(glyphName)
             if dependencies:
                 changedNames.update(dependencies)
 
-        remove = []
-        for key in list(_memoizeCache.keys()):
-            # the glyphname is hiding quite deep in key[2]
-            # (('glyphTwo',),)
-            # this is because of how immutify does it. Could be different I suppose but this works
-            if key[0] in ("getGlyphMutator", "collectSourcesForGlyph") and key[1] == self and key[2][0][0] in changedNames:
-                remove.append(key)
-        for key in remove:
-            del _memoizeCache[key]
-            if key in _memoizeStats:
-                del _memoizeStats[key]
-
-    def getGlyphDependencies(self, glyphName):
+        # the cache keeps an index of the entries for each glyph
+        self.memoizeCache.removeGlyphNames(changedNames)
+        if len(self._decomposedOutlines) or (self.glyphResultCache is not None and len(self.glyphResultCache)):
+            # decomposed outlines and glyphs contain the outlines of their base glyphs
+            decomposedNames = changedNames | (self.getGlyphDependencies(glyphName) or set())
+            self._decomposedOutlines.removeGlyphNames(decomposedNames)
+            if self.glyphResultCache is not None:
+                self.glyphResultCache.removeGlyphNames(decomposedNames)
+        if self._incompatibleGlyphs is not None:
+            # try these again, check again to know
+            for incompatible in self._incompatibleGlyphs.values():
+                for name in changedNames:
+                    incompatible.pop(name, None)
+
+    def getGlyphDependencies(self, glyphName, discreteLocation=None):
+        """ Return the names of the glyphs that use glyphName as a component, directly or nested.
+            Look in this discrete location, or in all of them if discreteLocation is None.
+            Returns None if glyphName is not used as a component.
+        """
+        if discreteLocation is not None:
+            discreteLocations = [discreteLocation]
+        else:
+            discreteLocations = self.getDiscreteLocations() or [None]
         dependencies = set()
-        for discreteLocation in self.getDiscreteLocations():
-            # this is expensive, should it be cached?
-            reverseComponentMap = self.getReverseComponentMapping()
-            if glyphName not in reverseComponentMap:
-                return None
-            for compName in reverseComponentMap[glyphName]:
-                dependencies.add(compName)
+        for discreteLocation in discreteLocations:
+            dependencies.update(self.getComponentGraph(discreteLocation).getDependencies(glyphName))
+        if not dependencies:
+            return None
         return dependencies
 
+    def getComponentGraph(self, discreteLocation=None):
+        """ Return the ComponentGraph of the sources in this discrete location.
+            It is made once, glyphChanged keeps it up to date.
+        """
+        key = self._getDiscreteLocationKey(discreteLocation)
+        graph = self._componentGraphs.get(key)
+        if graph is None:
+            graph = ComponentGraph()
+            for sourceDescriptor, layer in self._iterSourceLayers(discreteLocation):
+                graph.addSource(sourceDescriptor.name, getComponentReferences(layer))
+            self._componentGraphs[key] = graph
+        return graph
+
+    def _updateComponentGraphs(self, glyphName):
+        for key, graph in self._componentGraphs.items():
+            discreteLocation = dict(key) if key is not None else None
+            for sourceDescriptor, layer in self._iterSourceLayers(discreteLocation):
+                baseGlyphs = []
+                if glyphName in layer:
+                    baseGlyphs = [component.baseGlyph for component in layer[glyphName].components]
+                graph.updateGlyph(glyphName, sourceDescriptor.name, baseGlyphs)
+
+    def _iterSourceLayers(self, discreteLocation=None):
+        # (sourceDescriptor, font or layer) for the loaded sources in this discrete location
+        for sourceDescriptor in self.findSourceDescriptorsForDiscreteLocation(discreteLocation):
+            if sourceDescriptor.name not in self.fonts:
+                continue
+            font = self.fonts[sourceDescriptor.name]
+            if font is None:
+                continue
+            layer = font
+            if sourceDescriptor.layerName is not None:
+                layer = getLayer(font, sourceDescriptor.layerName)
+                if layer is None:
+                    continue
+            yield sourceDescriptor, layer
+
     def glyphsInCache(self):
         """report which glyphs are in the cache at the moment"""
-        names = set()
-        for key in list(_memoizeCache.keys()):
-            if key[0] in ("getGlyphMutator", "collectSourcesForGlyph") and key[1] == self:
-                names.add(key[2][0][0])
-        names = list(names)
+        names = self.memoizeCache.glyphNames()
         names.sort()
         return names
 
@@ -585,22 +699,16 @@ class UFOOperator(object):
         # make a list of all baseglyphs needed to build this glyph, at this location
         # Note: different discrete values mean that the glyph component set up can be different too
         continuousLocation, discreteLocation = self.splitLocation(location)
-        names = set()
-        def _getComponentNames(glyph):
-            # so we can do recursion
-            names = set()
-            for comp in glyph.components:
-                names.add(comp.baseGlyph)
-                for n in _getComponentNames(glyph.font[comp.baseGlyph]):
-                    names.add(n)
-            return list(names)
-        for sourceDescriptor in self.findSourceDescriptorsForDiscreteLocation(discreteLocation):
-            sourceFont = self.fonts[sourceDescriptor.name]
-            if glyphName not in sourceFont:
-                continue
-            [names.add(n) for n in _getComponentNames(sourceFont[glyphName])]
+        graph = self.getComponentGraph(discreteLocation)
+        names = graph.getBaseGlyphs(glyphName)
+        if graph.cycles and self.debug:
+            self.logger.info(f"collectBaseGlyphs: component cycles {graph.cycles}")
         return list(names)
 
+    def getComponentCycles(self, discreteLocation=None):
+        """ Return a list of tuples with the names of glyphs that use each other as components. """
+        return self.getComponentGraph(discreteLocation).getCycles()
+
     def findSourceDescriptorsForDiscreteLocation(self, discreteLocDict=None):
         # return a list of all sourcedescriptors that share the values in the discrete loc tuple
         # so this includes all sourcedescriptors that point to layers
@@ -626,8 +734,14 @@ class UFOOperator(object):
         # Return either a mutatorMath or a varlib.model object for calculating.
         if self.useVarlib:
             # use the varlib variation model
+            # mutators with masters at the same locations share the model
             try:
-                return dict(), VariationModelMutator(items, axes=self.doc.axes, extrapolate=True)
+                masterLocations = tuple(tuple(sorted(loc.items())) for loc, value in items)
+                model = self._variationModels.get(masterLocations)
+                mutator = VariationModelMutator(items, axes=self.doc.axes, model=model, extrapolate=True, useNumpy=self.useNumpy)
+                if model is None:
+                    self._variationModels[masterLocations] = mutator.model
+                return dict(), mutator
             except TypeError:
                 if self.debug:
                     note = "Error while making VariationModelMutator for {loc}:\n{traceback.format_exc()}"
@@ -695,8 +809,12 @@ class UFOOperator(object):
             Include None and foreground. XX Why
         """
         names = set([None, 'foreground'])
-        for key, font in self.fonts.items():
-            names.add(getDefaultLayerName(font))
+        for key in self.fonts.keys():
+            if isinstance(self.fonts, LazyFontMapping) and not self.fonts.isOpen(key):
+                # no need to open the font for this
+                names.add(self.fonts.getDefaultLayerName(key))
+            else:
+                names.add(getDefaultLayerName(self.fonts[key]))
         return list(names)
 
     def getReverseComponentMapping(self, discreteLocation=None):
@@ -728,8 +846,18 @@ class UFOOperator(object):
                 return reverseComponentMapping
         return {}
 
-    def generateUFOs(self, useVarlib=None):
-        # generate an UFO for each of the instance locations
+    def generateUFOs(self, useVarlib=None, workers=None, progressFunc=None, incremental=False, streaming=False):
+        """ Generate an UFO for each of the instance locations.
+            workers: number of processes to generate instances with.
+                Each process reads its own copy of the sources from disk.
+                None or 1: generate the instances in this process.
+            progressFunc: optional callback, called with (count, total, instanceDescriptor)
+                after each instance is saved.
+            incremental: compare the fingerprints of the sources with the ones stored in
+                the existing instance UFOs and only make and write the glyphs, kerning and info that changed.
+            streaming: write each glyph to the UFO as soon as it is made, instead of making
+                the whole font in memory first and saving it.
+        """
         previousModel = self.useVarlib
         if useVarlib is not None:
             self.useVarlib = useVarlib
@@ -737,32 +865,238 @@ class UFOOperator(object):
         self.loadFonts()
         if self.debug:
             self.logger.info("## generateUFO")
-        for instanceDescriptor in self.doc.instances:
-            if self.debug:
-                self.logger.infoItem(f"Generating UFO at {instanceDescriptor.location}")
-            if instanceDescriptor.path is None:
-                continue
-            pairs = None
-            bend = False
-            font = self.makeInstance(
-                instanceDescriptor,
-                processRules,
-                glyphNames=self.glyphNames,
-                decomposeComponents=False,
-                pairs=pairs,
-                bend=bend,
-            )
+        instanceDescriptors = [instanceDescriptor for instanceDescriptor in self.doc.instances if instanceDescriptor.path is not None]
+        total = len(instanceDescriptors)
+        if workers is not None and workers > 1 and total > 1:
             if self.debug:
-                self.logger.info(f"\t\t{os.path.basename(instanceDescriptor.path)}")
-            instanceFolder = os.path.dirname(instanceDescriptor.path)
-            if not os.path.exists(instanceFolder):
-                os.makedirs(instanceFolder)
-            font.save(instanceDescriptor.path)
-            glyphCount += len(font)
+                self.logger.infoItem(f"Generating {total} UFOs with {workers} workers")
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_initializeWorker, initargs=self._getWorkerArguments()) as executor:
+                futures = {executor.submit(_workerGenerateInstance, index, incremental, streaming): instanceDescriptor for index, instanceDescriptor in enumerate(self.doc.instances) if instanceDescriptor.path is not None}
+                for count, future in enumerate(concurrent.futures.as_completed(futures)):
+                    instanceDescriptor = futures[future]
+                    glyphCount += future.result()
+                    if self.debug:
+                        self.logger.info(f"\t\t{os.path.basename(instanceDescriptor.path)}")
+                    if progressFunc is not None:
+                        progressFunc(count + 1, total, instanceDescriptor)
+        else:
+            fingerprintCache = {}
+            for count, instanceDescriptor in enumerate(instanceDescriptors):
+                if self.debug:
+                    self.logger.infoItem(f"Generating UFO at {instanceDescriptor.location}")
+                if incremental:
+                    glyphCount += self._generateInstanceIncremental(instanceDescriptor, fingerprintCache, streaming)
+                else:
+                    glyphCount += self._generateInstance(instanceDescriptor, streaming)
+                if self.debug:
+                    self.logger.info(f"\t\t{os.path.basename(instanceDescriptor.path)}")
+                if progressFunc is not None:
+                    progressFunc(count + 1, total, instanceDescriptor)
         if self.debug:
             self.logger.info(f"\t\tGenerated {glyphCount} glyphs altogether.")
         self.useVarlib = previousModel
 
+    def _generateInstance(self, instanceDescriptor, streaming=False):
+        # make and save the UFO for this instance, return the number of glyphs
+        if streaming:
+            return self._generateInstanceStreaming(instanceDescriptor)
+        pairs = None
+        bend = False
+        font = self.makeInstance(
+            instanceDescriptor,
+            processRules,
+            glyphNames=self.glyphNames,
+            decomposeComponents=False,
+            pairs=pairs,
+            bend=bend,
+        )
+        instanceFolder = os.path.dirname(instanceDescriptor.path)
+        if not os.path.exists(instanceFolder):
+            os.makedirs(instanceFolder)
+        font.save(instanceDescriptor.path)
+        return len(font)
+
+    def _generateInstanceStreaming(self, instanceDescriptor):
+        # make the UFO for this instance and write each glyph as soon as it is made,
+        # return the number of glyphs
+        continuousLocation, discreteLocation = self.splitLocation(instanceDescriptor.location)
+        if not self.extrapolate:
+            continuousLocation = self.clipDesignLocation(continuousLocation)
+        # the font only gets the info, kerning, groups, features and lib
+        font = self._newInstanceFont()
+        self._makeInstanceFontData(instanceDescriptor, font)
+        if 'public.glyphOrder' not in font.lib.keys():
+            font.lib['public.glyphOrder'] = self.glyphNames
+        instanceFolder = os.path.dirname(instanceDescriptor.path)
+        if not os.path.exists(instanceFolder):
+            os.makedirs(instanceFolder)
+        writer = StreamingUFOWriter(instanceDescriptor.path)
+        glyphOrder = font.lib['public.glyphOrder']
+        glyphOrderNames = set(glyphOrder)
+        try:
+            for glyphName, glyphInstanceObject, unicodes in self._iterGlyphInstances(self.glyphNames, continuousLocation, discreteLocation):
+                glyph = self._newInstanceGlyph(glyphName)
+                if self._extractGlyphInstance(glyph, glyphInstanceObject, unicodes):
+                    self._addInstanceLib(font, instanceDescriptor)
+                writer.writeGlyph(glyph)
+                if glyphName not in glyphOrderNames:
+                    # added at the end of the glyph order, the same as when the glyph is added to a font
+                    glyphOrder = glyphOrder + [glyphName]
+                    glyphOrderNames.add(glyphName)
+        except Exception:
+            writer.abort()
+            raise
+        font.lib['public.glyphOrder'] = glyphOrder
+        writer.close(font)
+        return writer.glyphCount
+
+    def _generateInstanceIncremental(self, instanceDescriptor, fingerprintCache=None, streaming=False):
+        # only make and save the parts of this instance whose fingerprints changed,
+        # return the number of glyphs written
+        fingerprints = self.getInstanceFingerprints(instanceDescriptor, fingerprintCache)
+        previous = None
+        if issubclass(self.fontClass, defcon.Font) and os.path.exists(instanceDescriptor.path):
+            previous = readFingerprints(instanceDescriptor.path)
+        if previous is None or previous.get("context") != fingerprints["context"]:
+            glyphCount = self._generateInstance(instanceDescriptor, streaming)
+            writeFingerprints(instanceDescriptor.path, fingerprints)
+            return glyphCount
+        previousGlyphs = previous.get("glyphs", {})
+        changedGlyphNames = [glyphName for glyphName in self.glyphNames if previousGlyphs.get(glyphName) != fingerprints["glyphs"][glyphName]]
+        removedGlyphNames = [glyphName for glyphName in previousGlyphs if glyphName not in fingerprints["glyphs"]]
+        fontChanged = previous.get("font") != fingerprints["font"]
+        if not changedGlyphNames and not removedGlyphNames and not fontChanged:
+            return 0
+        if self.debug:
+            self.logger.info(f"\t\t\t{len(changedGlyphNames)} glyphs changed, {len(removedGlyphNames)} glyphs removed, font data changed: {fontChanged}")
+        continuousLocation, discreteLocation = self.splitLocation(instanceDescriptor.location)
+        if not self.extrapolate:
+            continuousLocation = self.clipDesignLocation(continuousLocation)
+        font = self._newInstanceFont()
+        if fontChanged:
+            self._makeInstanceFontData(instanceDescriptor, font)
+            # before the glyphs are added, the same as makeInstance
+            if 'public.glyphOrder' not in font.lib.keys():
+                font.lib['public.glyphOrder'] = self.glyphNames
+            glyphOrder = list(font.lib['public.glyphOrder'])
+        glyphInstances = self._iterGlyphInstances(changedGlyphNames, continuousLocation, discreteLocation)
+        self._addGlyphInstances(font, glyphInstances, instanceDescriptor)
+        # the existing UFO is read lazily and saved in place,
+        # defcon only writes the glyphs and the data that were changed.
+        existing = self._instantiateFont(instanceDescriptor.path)
+        if not fontChanged:
+            # defcon moves a glyph that is removed and inserted again to the end of the glyph order
+            glyphOrder = [glyphName for glyphName in existing.glyphOrder if glyphName not in removedGlyphNames]
+        for glyphName in changedGlyphNames + removedGlyphNames:
+            if glyphName in existing:
+                del existing[glyphName]
+            if glyphName in font:
+                existing.insertGlyph(font[glyphName], name=glyphName)
+        if fontChanged:
+            for attribute in fontInfoAttributesVersion3:
+                setattr(existing.info, attribute, getattr(font.info, attribute))
+            existing.kerning.clear()
+            existing.kerning.update(font.kerning)
+            existing.groups.clear()
+            existing.groups.update(font.groups)
+            existing.features.text = font.features.text
+            for key in ('designspace.location', 'designspace.mathmodel'):
+                if key not in font.lib.keys() and key in existing.lib.keys():
+                    # these are only added with the glyphs
+                    font.lib[key] = existing.lib[key]
+            existing.lib.clear()
+            existing.lib.update(font.lib)
+        # a full run adds the glyphs that are not in the glyph order at the end
+        glyphOrderNames = set(glyphOrder)
+        existing.glyphOrder = glyphOrder + [glyphName for glyphName in self.glyphNames if glyphName not in glyphOrderNames and glyphName in existing]
+        existing.save()
+        writeFingerprints(instanceDescriptor.path, fingerprints)
+        return len(changedGlyphNames)
+
+    def getInstanceFingerprints(self, instanceDescriptor, fingerprintCache=None):
+        """ Return the fingerprints of the data this instance is made from.
+                context: the axes, the sources, the location and the settings.
+                font: the info, kerning, groups, features and lib of the sources.
+                glyphs: a fingerprint of the source glyphs for each glyph name.
+            fingerprintCache: optional dict to share the fingerprints of the sources between instances.
+        """
+        if fingerprintCache is None:
+            fingerprintCache = {}
+        continuousLocation, discreteLocation = self.splitLocation(instanceDescriptor.location)
+        sources = self.findSourceDescriptorsForDiscreteLocation(discreteLocation)
+        context = makeFingerprint((
+            [axis.asdict() for axis in self.doc.axes],
+            [(s.name, s.path, s.layerName, sorted(s.location.items()), sorted(s.mutedGlyphNames), s.muteKerning, s.muteInfo, s.copyInfo, s.copyLib, s.copyGroups, s.copyFeatures) for s in self.doc.sources],
+            sorted(instanceDescriptor.location.items()),
+            (self.ufoVersion, self.useVarlib, self.useNumpy, self.roundGeometry, self.extrapolate, self.strict, self.mutedAxisNames),
+            (self.fontClass.__name__, self.mathGlyphClass.__name__, self.mathInfoClass.__name__, self.mathKerningClass.__name__),
+        ))
+        fontData = [
+            instanceDescriptor.familyName,
+            instanceDescriptor.styleName,
+            instanceDescriptor.postScriptFontName,
+            instanceDescriptor.styleMapFamilyName,
+            instanceDescriptor.styleMapStyleName,
+            instanceDescriptor.kerning,
+            sorted(self.glyphNames),
+        ]
+        for sourceDescriptor in self.doc.sources:
+            fontData.append(self._getSourceFontFingerprint(sourceDescriptor, fingerprintCache))
+        glyphs = {}
+        for glyphName in self.glyphNames:
+            glyphs[glyphName] = makeFingerprint([self._getSourceGlyphFingerprint(sourceDescriptor, glyphName, fingerprintCache) for sourceDescriptor in sources])
+        return dict(context=context, font=makeFingerprint(fontData), glyphs=glyphs)
+
+    def _getSourceFontFingerprint(self, sourceDescriptor, fingerprintCache):
+        key = ("font", sourceDescriptor.name)
+        if key not in fingerprintCache:
+            f = self.fonts.get(sourceDescriptor.name)
+            if f is None or sourceDescriptor.layerName is not None:
+                fingerprintCache[key] = None
+            else:
+                fingerprintCache[key] = makeFingerprint((
+                    fontInfoFingerprint(f.info, fontInfoAttributesVersion3),
+                    sorted(f.kerning.items()),
+                    sorted(f.groups.items()),
+                    f.features.text,
+                    sorted(f.lib.items()),
+                ))
+        return fingerprintCache[key]
+
+    def _getSourceGlyphFingerprint(self, sourceDescriptor, glyphName, fingerprintCache):
+        key = ("glyph", sourceDescriptor.name, glyphName)
+        if key not in fingerprintCache:
+            fingerprint = None
+            f = self.fonts.get(sourceDescriptor.name)
+            if f is not None and glyphName in f:
+                sourceLayer = f
+                if sourceDescriptor.layerName is not None:
+                    sourceLayer = getLayer(f, sourceDescriptor.layerName)
+                if sourceLayer is not None and glyphName in sourceLayer:
+                    fingerprint = glyphFingerprint(sourceLayer[glyphName])
+            fingerprintCache[key] = fingerprint
+        return fingerprintCache[key]
+
+    def _getWorkerArguments(self):
+        # everything a worker process needs to make its own operator.
+        # glyphNames are passed along so the glyph order does not depend on the process.
+        settings = dict(
+            ufoVersion=self.ufoVersion,
+            useVarlib=self.useVarlib,
+            extrapolate=self.extrapolate,
+            strict=self.strict,
+        )
+        attributes = dict(
+            roundGeometry=self.roundGeometry,
+            useNumpy=self.useNumpy,
+            mutedAxisNames=self.mutedAxisNames,
+            mutatorCachePath=self.mutatorCachePath,
+            _incompatibleGlyphs=self._incompatibleGlyphs,
+            instanceFontClass=self.instanceFontClass,
+            instanceGlyphClass=self.instanceGlyphClass,
+        )
+        return type(self), self.doc, settings, attributes, self.glyphNames
+
     generateUFO = generateUFOs
 
     @memoize
@@ -773,6 +1107,13 @@ class UFOOperator(object):
             sources = self.findSourceDescriptorsForDiscreteLocation(discreteLocation)
         else:
             sources = self.doc.sources
+        mutatorDiskCache = self.getMutatorDiskCache()
+        if mutatorDiskCache is not None:
+            diskCacheKey = self._getMutatorCacheKey("info", discreteLocation, [self._getSourceInfoFingerprint(sourceDescriptor) for sourceDescriptor in sources])
+            cached = mutatorDiskCache.get(diskCacheKey)
+            if cached is not None:
+                self._infoMutator = cached
+                return self._infoMutator
         for sourceDescriptor in sources:
             if sourceDescriptor.layerName is not None:
                 continue
@@ -787,6 +1128,8 @@ class UFOOperator(object):
                 infoItems.append((loc, self.mathInfoClass(sourceFont.info)))
         infoBias = self.newDefaultLocation(bend=True, discreteLocation=discreteLocation)
         bias, self._infoMutator = self.getVariationModel(infoItems, axes=self.getSerializedAxes(), bias=infoBias)
+        if mutatorDiskCache is not None and self._infoMutator is not None:
+            mutatorDiskCache.set(diskCacheKey, self._infoMutator)
         return self._infoMutator
 
     @memoize
@@ -801,6 +1144,15 @@ class UFOOperator(object):
             sources = self.sources
         kerningItems = []
         foregroundLayers = self.collectForegroundLayerNames()
+        mutatorDiskCache = None
+        if pairs is None:
+            mutatorDiskCache = self.getMutatorDiskCache()
+        if mutatorDiskCache is not None:
+            diskCacheKey = self._getMutatorCacheKey("kerning", discreteLocation, [self._getSourceKerningFingerprint(sourceDescriptor) for sourceDescriptor in sources], sorted(foregroundLayers, key=str))
+            cached = mutatorDiskCache.get(diskCacheKey)
+            if cached is not None:
+                self._kerningMutator = cached
+                return self._kerningMutator
         if pairs is None:
             for sourceDescriptor in sources:
                 if sourceDescriptor.layerName not in foregroundLayers:
@@ -828,24 +1180,82 @@ class UFOOperator(object):
                         continue
                     continuous, discrete = self.splitLocation(sourceDescriptor.location)
                     loc = Location(continuous)
-                    # XXX can we get the kern value from the fontparts kerning object?
-                    kerningItem = self.mathKerningClass(sourceFont.kerning, sourceFont.groups)
-                    if kerningItem is not None:
-                        sparseKerning = {}
-                        for pair in pairs:
-                            v = kerningItem.get(pair)
-                            if v is not None:
-                                sparseKerning[pair] = v
-                        kerningItems.append((loc, self.mathKerningClass(sparseKerning)))
+                    sparseKerning = self.getKerningPairIndex(sourceDescriptor.name, discreteLocation=discreteLocation).getPairs(pairs)
+                    kerningItems.append((loc, self.mathKerningClass(sparseKerning)))
         kerningBias = self.newDefaultLocation(bend=True, discreteLocation=discreteLocation)
-        bias, thing = self.getVariationModel(kerningItems, axes=self.getSerializedAxes(), bias=kerningBias) #xx
         bias, self._kerningMutator = self.getVariationModel(kerningItems, axes=self.getSerializedAxes(), bias=kerningBias)
+        if mutatorDiskCache is not None and self._kerningMutator is not None:
+            mutatorDiskCache.set(diskCacheKey, self._kerningMutator)
         return self._kerningMutator
 
+    def getKerningGroupIndexes(self, discreteLocation=None):
+        """ Return {source name: KerningGroupIndex} for the sources in this discrete location.
+            Sources with the same kerning groups share one index.
+            They are made once, kerningChanged() removes them.
+        """
+        key = self._getDiscreteLocationKey(discreteLocation)
+        cached = self._kerningGroupIndexes.get(key)
+        if cached is None or any(self.fonts.get(sourceName) is not sourceFont for sourceName, (sourceFont, groupIndex) in cached.items()):
+            if discreteLocation:
+                sources = self.findSourceDescriptorsForDiscreteLocation(discreteLocation)
+            else:
+                sources = self.sources
+            cached = {}
+            shared = []
+            for sourceDescriptor in sources:
+                sourceFont = self.fonts.get(sourceDescriptor.name)
+                if sourceFont is None:
+                    continue
+                kerningGroups = getKerningGroups(sourceFont.groups)
+                for groupIndex in shared:
+                    if groupIndex.groups == kerningGroups:
+                        break
+                else:
+                    groupIndex = KerningGroupIndex(kerningGroups)
+                    shared.append(groupIndex)
+                cached[sourceDescriptor.name] = sourceFont, groupIndex
+            self._kerningGroupIndexes[key] = cached
+        return {sourceName: groupIndex for sourceName, (sourceFont, groupIndex) in cached.items()}
+
+    def getKerningPairIndex(self, sourceName, discreteLocation=None):
+        """ Return the KerningPairIndex for the kerning and groups of this source.
+            It is made once, kerningChanged() removes it.
+        """
+        sourceFont = self.fonts[sourceName]
+        cached = self._kerningPairIndexes.get(sourceName)
+        if cached is not None and cached[0] is sourceFont:
+            return cached[1]
+        groupIndex = self.getKerningGroupIndexes(discreteLocation).get(sourceName)
+        if groupIndex is None:
+            groupIndex = KerningGroupIndex(sourceFont.groups)
+        index = KerningPairIndex(sourceFont.kerning, groupIndex)
+        self._kerningPairIndexes[sourceName] = sourceFont, index
+        return index
+
+    def _extractKerning(self, kerningObject, font, discreteLocation=None):
+        # MathKerning.extractKerning, with the groups from the group index
+        # if all sources in the discrete location have the same kerning groups
+        groupIndexes = set(self.getKerningGroupIndexes(discreteLocation).values())
+        if len(groupIndexes) != 1:
+            kerningObject.extractKerning(font)
+            return
+        font.kerning.clear()
+        font.kerning.update(dict(kerningObject.items()))
+        font.groups.update(groupIndexes.pop().getGroups())
+
     @memoize
     def getGlyphMutator(self, glyphName, decomposeComponents=False, **discreteLocation):
         """make a mutator / varlib object for glyphName, with the sources for the given discrete location"""
-        items, unicodes = self.collectSourcesForGlyph(glyphName, decomposeComponents=decomposeComponents, **discreteLocation)
+        mutatorDiskCache = None
+        if not decomposeComponents:
+            # decomposed mutators also depend on the component base glyphs, they are not kept on disk
+            mutatorDiskCache = self.getMutatorDiskCache()
+        if mutatorDiskCache is not None:
+            diskCacheKey = self._getGlyphMutatorCacheKey(glyphName, discreteLocation.get("discreteLocation"))
+            cached = mutatorDiskCache.get(diskCacheKey)
+            if cached is not None:
+                return cached
+        items, unicodes = self._collectSourcesForGlyph(glyphName, decomposeComponents=decomposeComponents, **discreteLocation)
         new = []
         for a, b, c in items:
             if hasattr(b, "toMathGlyph"):
@@ -864,8 +1274,74 @@ class UFOOperator(object):
             note = f"Error in getGlyphMutator for {glyphName}:\n{error}"
             if self.debug:
                 self.logger.info(note)
+        if mutatorDiskCache is not None:
+            mutatorDiskCache.set(diskCacheKey, (thing, unicodes))
         return thing, unicodes
 
+    def getMutatorDiskCache(self):
+        """ Return the MutatorDiskCache for self.mutatorCachePath, or None. """
+        if self.mutatorCachePath is None:
+            return None
+        if self._mutatorDiskCache is None or self._mutatorDiskCache.path != self.mutatorCachePath:
+            self._mutatorDiskCache = MutatorDiskCache(self.mutatorCachePath)
+        return self._mutatorDiskCache
+
+    def _getMutatorCacheKey(self, kind, discreteLocation, sourceFingerprints, *extra):
+        # a fingerprint of everything a mutator is made from
+        return makeFingerprint((
+            kind,
+            mutatorCacheFormatVersion,
+            fontTools.version,
+            getattr(fontMath, "__version__", None),
+            [axis.asdict() for axis in self.doc.axes],
+            sorted(discreteLocation.items()) if discreteLocation else None,
+            (self.useVarlib, self.useNumpy, self.extrapolate, self.strict, self.mutedAxisNames),
+            (self.mathGlyphClass.__name__, self.mathInfoClass.__name__, self.mathKerningClass.__name__),
+            sourceFingerprints,
+            extra,
+        ))
+
+    def _describeSourceForCache(self, sourceDescriptor):
+        return (
+            sourceDescriptor.name,
+            sorted(sourceDescriptor.location.items()),
+            sourceDescriptor.layerName,
+            sorted(sourceDescriptor.mutedGlyphNames),
+            sourceDescriptor.muteKerning,
+            sourceDescriptor.muteInfo,
+            os.path.exists(sourceDescriptor.path) if sourceDescriptor.path is not None else False,
+            self.fonts.get(sourceDescriptor.name) is not None,
+        )
+
+    def _getGlyphMutatorCacheKey(self, glyphName, discreteLocation):
+        sourceFingerprints = []
+        for sourceDescriptor in self.findSourceDescriptorsForDiscreteLocation(discreteLocation):
+            fingerprint = None
+            f = self.fonts.get(sourceDescriptor.name)
+            if f is not None and glyphName in f:
+                layerName = sourceDescriptor.layerName
+                if layerName is None:
+                    layerName = getDefaultLayerName(f)
+                sourceLayer = getLayer(f, layerName)
+                if sourceLayer is not None and glyphName in sourceLayer:
+                    fingerprint = layerGlyphFingerprint(sourceLayer, glyphName)
+            sourceFingerprints.append((self._describeSourceForCache(sourceDescriptor), fingerprint))
+        return self._getMutatorCacheKey("glyph", discreteLocation, sourceFingerprints, glyphName)
+
+    def _getSourceInfoFingerprint(self, sourceDescriptor):
+        fingerprint = None
+        f = self.fonts.get(sourceDescriptor.name)
+        if f is not None:
+            fingerprint = fontInfoFingerprint(f.info, fontInfoAttributesVersion3)
+        return self._describeSourceForCache(sourceDescriptor), fingerprint
+
+    def _getSourceKerningFingerprint(self, sourceDescriptor):
+        fingerprint = None
+        f = self.fonts.get(sourceDescriptor.name)
+        if f is not None:
+            fingerprint = makeFingerprint((sorted(f.kerning.items()), sorted((name, list(members)) for name, members in f.groups.items())))
+        return self._describeSourceForCache(sourceDescriptor), fingerprint
+
     def isLocalDefault(self, location):
         # return True if location is a local default
         # check for bending
@@ -960,6 +1436,10 @@ class UFOOperator(object):
 
             findSourceDescriptorsForDiscreteLocation returns sources from layers as well
         """
+        return self._collectSourcesForGlyph(glyphName, decomposeComponents=decomposeComponents, discreteLocation=discreteLocation)
+
+    def _collectSourcesForGlyph(self, glyphName, decomposeComponents=False, discreteLocation=None):
+        # not memoized: getGlyphMutator keeps what it needs from these in the mutator
         items = []
         empties = []
         foundEmpty = False
@@ -1024,8 +1504,7 @@ class UFOOperator(object):
                 # what about decomposing glyphs in a partial font?
                 temp = self.glyphClass()
                 p = temp.getPointPen()
-                dpp = DecomposePointPen(sourceLayer, p)
-                sourceGlyphObject.drawPoints(dpp)
+                self._decomposedOutlines.drawDecomposed((sourceDescriptor.name, layerName), sourceLayer, glyphName, p)
                 temp.width = sourceGlyphObject.width
                 temp.name = sourceGlyphObject.name
                 processThis = temp
@@ -1069,6 +1548,48 @@ class UFOOperator(object):
                     checkedItems.append(items[i])
         return checkedItems, unicodes
 
+    def checkGlyphCompatibility(self, glyphNames=None):
+        """ Compare the structure of the sources of each glyph, in each discrete location.
+            Returns a list of dicts with glyphName, discreteLocation, problems and warnings,
+            for the glyphs that have problems or warnings.
+            Glyphs with problems can not be interpolated, makeInstance skips them from now on.
+        """
+        if not self._fontsLoaded:
+            self.loadFonts()
+        if glyphNames is None:
+            glyphNames = self.glyphNames
+        if self._incompatibleGlyphs is None:
+            self._incompatibleGlyphs = {}
+        report = []
+        for discreteLocation in self.getDiscreteLocations() or [None]:
+            discreteLocation = discreteLocation or None
+            incompatible = self._incompatibleGlyphs.setdefault(self._getDiscreteLocationKey(discreteLocation), {})
+            for glyphName in glyphNames:
+                items, unicodes = self._collectSourcesForGlyph(glyphName, discreteLocation=discreteLocation)
+                structures = [(sourceInfo["sourceName"], getGlyphStructure(mathGlyph)) for location, mathGlyph, sourceInfo in items]
+                problems, warnings = compareGlyphStructures(structures)
+                if problems:
+                    incompatible[glyphName] = unicodes
+                else:
+                    incompatible.pop(glyphName, None)
+                if problems or warnings:
+                    report.append(dict(glyphName=glyphName, discreteLocation=discreteLocation, problems=problems, warnings=warnings))
+                    if self.debug:
+                        for note in problems + warnings:
+                            self.logger.info(f"\tcheckGlyphCompatibility {glyphName} {discreteLocation}: {note}")
+        return report
+
+    def getIncompatibleGlyphNames(self, discreteLocation=None):
+        """ Return the names of the glyphs checkGlyphCompatibility found to be incompatible, or None if it did not run. """
+        if self._incompatibleGlyphs is None:
+            return None
+        return sorted(self._incompatibleGlyphs.get(self._getDiscreteLocationKey(discreteLocation), {}))
+
+    def _getDiscreteLocationKey(self, discreteLocation):
+        if not discreteLocation:
+            return None
+        return tuple(sorted(discreteLocation.items()))
+
     def collectMastersForGlyph(self, glyphName, decomposeComponents=False, discreteLocation=None):
         # compatibility thing for designspaceProblems.
         checkedItems, unicodes = self.collectSourcesForGlyph(glyphName, decomposeComponents=False, discreteLocation=None)
@@ -1079,15 +1600,53 @@ class UFOOperator(object):
             glyphNames=None,
             decomposeComponents=False,
             pairs=None,
-            bend=False):
-        """ Generate a font object for this instance """
+            bend=False,
+            workers=None,
+            decomposeAfterInterpolation=False):
+        """ Generate a font object for this instance
+            decomposeAfterInterpolation: with decomposeComponents, interpolate the glyphs with their components,
+                then decompose them with the base glyphs interpolated at the same location.
+            workers: number of processes to calculate the glyphs with.
+                The glyphs are split into shards, each worker reads its own copy of the sources from disk.
+                None or 1: calculate the glyphs in this process.
+        """
         if doRules is not None:
             warn('The doRules argument in DesignSpaceProcessor.makeInstance() is deprecated', DeprecationWarning, stacklevel=2)
         continuousLocation, discreteLocation = self.splitLocation(instanceDescriptor.location)
         if not self.extrapolate:
             # Axis values are in userspace, so this needs to happen before bending
             continuousLocation = self.clipDesignLocation(continuousLocation)
-        font = self._instantiateFont(None)
+        font = self._newInstanceFont()
+        self._makeInstanceFontData(instanceDescriptor, font, pairs=pairs, bend=bend)
+
+        # ok maybe now it is time to calculate some glyphs
+        # glyphs
+        if glyphNames:
+            selectedGlyphNames = glyphNames
+        else:
+            # since all glyphs are processed, decomposing components is unecessary
+            # maybe that's confusing and components should be decomposed anyway 
+            # if decomposeComponents was set to True?
+            decomposeComponents = False
+            selectedGlyphNames = self.glyphNames
+        if 'public.glyphOrder' not in font.lib.keys():
+            # should be the glyphorder from the default, yes?
+            font.lib['public.glyphOrder'] = selectedGlyphNames
+
+        if workers is not None and workers > 1 and len(selectedGlyphNames) > 1:
+            glyphInstances = self._makeGlyphInstancesWithWorkers(selectedGlyphNames, continuousLocation, discreteLocation, decomposeComponents, bend, workers, decomposeAfterInterpolation)
+        else:
+            glyphInstances = self._iterGlyphInstances(selectedGlyphNames, continuousLocation, discreteLocation, decomposeComponents, bend, decomposeAfterInterpolation)
+        self._addGlyphInstances(font, glyphInstances, instanceDescriptor)
+        if self.debug:
+            self.logger.info(f"\t\t\t{len(selectedGlyphNames)} glyphs added")
+        return font
+
+    def _makeInstanceFontData(self, instanceDescriptor, font, pairs=None, bend=False):
+        # add the kerning, info, lib, groups and features for this instance to font
+        continuousLocation, discreteLocation = self.splitLocation(instanceDescriptor.location)
+        if not self.extrapolate:
+            continuousLocation = self.clipDesignLocation(continuousLocation)
         loc = Location(continuousLocation)
         anisotropic = False
         locHorizontal = locVertical = loc
@@ -1110,7 +1669,7 @@ class UFOOperator(object):
                 kerningMutator = self.getKerningMutator(discreteLocation=discreteLocation)
                 if kerningMutator is not None:
                     kerningObject = kerningMutator.makeInstance(locHorizontal, bend=bend)
-                    kerningObject.extractKerning(font)
+                    self._extractKerning(kerningObject, font, discreteLocation)
                     if self.debug:
                         self.logger.info(f"\t\t\t{len(font.kerning)} kerning pairs added")
 
@@ -1153,33 +1712,82 @@ class UFOOperator(object):
                     featuresText = self.fonts[sourceDescriptor.name].features.text
                     font.features.text = featuresText
 
-        # ok maybe now it is time to calculate some glyphs
-        # glyphs
-        if glyphNames:
-            selectedGlyphNames = glyphNames
+    def _addGlyphInstances(self, font, glyphInstances, instanceDescriptor):
+        # add the (glyphName, glyphInstanceObject, unicodes) from glyphInstances to font
+        for glyphName, glyphInstanceObject, unicodes in glyphInstances:
+            font.newGlyph(glyphName)
+            if self._extractGlyphInstance(font[glyphName], glyphInstanceObject, unicodes):
+                self._addInstanceLib(font, instanceDescriptor)
+
+    def _extractGlyphInstance(self, glyph, glyphInstanceObject, unicodes):
+        # put the glyphInstanceObject in glyph, return False if there is no glyphInstanceObject
+        glyph.clear()
+        glyph.unicodes = unicodes
+        if glyphInstanceObject is None:
+            # the mutator could not make this glyph
+            return False
+        try:
+            # File "/Users/erik/code/ufoProcessor/Lib/ufoProcessor/__init__.py", line 649, in makeInstance
+            #   glyphInstanceObject.extractGlyph(font[glyphName], onlyGeometry=True)
+            # File "/Applications/RoboFont.app/Contents/Resources/lib/python3.6/fontMath/mathGlyph.py", line 315, in extractGlyph
+            #   glyph.anchors = [dict(anchor) for anchor in self.anchors]
+            # File "/Applications/RoboFont.app/Contents/Resources/lib/python3.6/fontParts/base/base.py", line 103, in __set__
+            #   raise FontPartsError("no setter for %r" % self.name)
+            #   fontParts.base.errors.FontPartsError: no setter for 'anchors'
+            if hasattr(glyph, "fromMathGlyph"):
+                glyph.fromMathGlyph(glyphInstanceObject)
+            else:
+                glyphInstanceObject.extractGlyph(glyph, onlyGeometry=True)
+        except TypeError:
+            # this causes ruled glyphs to end up in the wrong glyphname
+            # but defcon2 objects don't support it
+            pPen = glyph.getPointPen()
+            glyph.clear()
+            glyphInstanceObject.drawPoints(pPen)
+        glyph.width = glyphInstanceObject.width
+        return True
+
+    def _addInstanceLib(self, font, instanceDescriptor):
+        # add designspace location to lib
+        font.lib['designspace.location'] = list(instanceDescriptor.location.items())
+        if self.useVarlib:
+            font.lib['designspace.mathmodel'] = "fonttools.varlib"
         else:
-            # since all glyphs are processed, decomposing components is unecessary
-            # maybe that's confusing and components should be decomposed anyway 
-            # if decomposeComponents was set to True?
-            decomposeComponents = False
-            selectedGlyphNames = self.glyphNames
-        if 'public.glyphOrder' not in font.lib.keys():
-            # should be the glyphorder from the default, yes?
-            font.lib['public.glyphOrder'] = selectedGlyphNames
+            font.lib['designspace.mathmodel'] = "mutatorMath"
 
-        for glyphName in selectedGlyphNames:
-            # can we take all this into a separate method for making a preview glyph object?
+    def _iterGlyphInstances(self, glyphNames, continuousLocation, discreteLocation=None, decomposeComponents=False, bend=False, decomposeAfterInterpolation=False):
+        """ Generate (glyphName, glyphInstanceObject, unicodes) for each glyph that has a mutator.
+            glyphInstanceObject is None if the mutator could not make the instance.
+        """
+        locHorizontal, locVertical = self.splitAnisotropic(Location(continuousLocation))
+        anisotropic = self.isAnisotropic(continuousLocation)
+        decomposeAfterInterpolation = decomposeComponents and decomposeAfterInterpolation
+        if decomposeAfterInterpolation:
+            decomposeComponents = False
+            interpolateDecomposed = self._makeDecomposingInterpolator(
+                lambda glyphMutator, location: glyphMutator.makeInstance(location, bend=bend),
+                [locHorizontal, locVertical] if anisotropic else [continuousLocation],
+                discreteLocation)
+        incompatible = {}
+        if self._incompatibleGlyphs is not None:
+            incompatible = self._incompatibleGlyphs.get(self._getDiscreteLocationKey(discreteLocation), {})
+        for glyphName in glyphNames:
+            if glyphName in incompatible:
+                # checkGlyphCompatibility knows this will not interpolate
+                if self.debug:
+                    self.logger.info(f"makeInstance: skipping incompatible glyph {glyphName}")
+                yield glyphName, None, incompatible[glyphName]
+                continue
             glyphMutator, unicodes = self.getGlyphMutator(glyphName, decomposeComponents=decomposeComponents, discreteLocation=discreteLocation)
             if glyphMutator is None:
                 if self.debug:
                     note = f"makeInstance: Could not make mutator for glyph {glyphName}"
                     self.logger.info(note)
                 continue
-            font.newGlyph(glyphName)
-            font[glyphName].clear()
-            font[glyphName].unicodes = unicodes
             try:
-                if not self.isAnisotropic(continuousLocation):
+                if decomposeAfterInterpolation:
+                    glyphInstanceObject = interpolateDecomposed(glyphMutator, glyphName)
+                elif not anisotropic:
                     glyphInstanceObject = glyphMutator.makeInstance(continuousLocation, bend=bend)
                 else:
                     # split anisotropic location into horizontal and vertical components
@@ -1192,6 +1800,7 @@ class UFOOperator(object):
                 if self.debug:
                     note = "makeInstance: Quite possibly some sort of data alignment error in %s" % glyphName
                     self.logger.info(note)
+                yield glyphName, None, unicodes
                 continue
             if self.roundGeometry:
                 try:
@@ -1202,34 +1811,75 @@ class UFOOperator(object):
                     if self.debug:
                         note = f"makeInstance: no round method for {glyphInstanceObject} ?"
                         self.logger.info(note)
-            try:
-                # File "/Users/erik/code/ufoProcessor/Lib/ufoProcessor/__init__.py", line 649, in makeInstance
-                #   glyphInstanceObject.extractGlyph(font[glyphName], onlyGeometry=True)
-                # File "/Applications/RoboFont.app/Contents/Resources/lib/python3.6/fontMath/mathGlyph.py", line 315, in extractGlyph
-                #   glyph.anchors = [dict(anchor) for anchor in self.anchors]
-                # File "/Applications/RoboFont.app/Contents/Resources/lib/python3.6/fontParts/base/base.py", line 103, in __set__
-                #   raise FontPartsError("no setter for %r" % self.name)
-                #   fontParts.base.errors.FontPartsError: no setter for 'anchors'
-                if hasattr(font[glyphName], "fromMathGlyph"):
-                    font[glyphName].fromMathGlyph(glyphInstanceObject)
-                else:
-                    glyphInstanceObject.extractGlyph(font[glyphName], onlyGeometry=True)
-            except TypeError:
-                # this causes ruled glyphs to end up in the wrong glyphname
-                # but defcon2 objects don't support it
-                pPen = font[glyphName].getPointPen()
-                font[glyphName].clear()
-                glyphInstanceObject.drawPoints(pPen)
-            font[glyphName].width = glyphInstanceObject.width
-            # add designspace location to lib
-            font.lib['designspace.location'] = list(instanceDescriptor.location.items())
-            if self.useVarlib:
-                font.lib['designspace.mathmodel'] = "fonttools.varlib"
-            else:
-                font.lib['designspace.mathmodel'] = "mutatorMath"
+            yield glyphName, glyphInstanceObject, unicodes
+
+    def _makeDecomposingInterpolator(self, interpolate, locations, discreteLocation):
+        """ Return a function(glyphMutator, glyphName) that interpolates a glyph with its components,
+            then decomposes it with the base glyphs interpolated at the same location.
+            interpolate(glyphMutator, location): make the instance at one location.
+            locations: [location], or [horizontal location, vertical location] for an anisotropic location,
+                these are decomposed separately and merged.
+            The interpolated base glyphs are kept for the next glyphs.
+        """
+        decomposers = []
+        for location in locations:
+            def interpolateBaseGlyph(glyphName, location=location):
+                glyphMutator, unicodes = self.getGlyphMutator(glyphName, discreteLocation=discreteLocation)
+                if glyphMutator is None:
+                    return None
+                try:
+                    return interpolate(glyphMutator, location)
+                except IndexError:
+                    return None
+            decomposers.append((location, interpolateBaseGlyph, {}))
+        def interpolateDecomposed(glyphMutator, glyphName):
+            results = []
+            for location, interpolateBaseGlyph, decomposedBaseGlyphs in decomposers:
+                glyphInstanceObject = interpolate(glyphMutator, location)
+                results.append(self._decomposeGlyphInstance(glyphInstanceObject, interpolateBaseGlyph, decomposedBaseGlyphs, {glyphName}))
+            if len(results) == 1:
+                return results[0]
+            return (1, 0) * results[0] + (0, 1) * results[1]
+        return interpolateDecomposed
+
+    def _decomposeGlyphInstance(self, glyphInstanceObject, interpolateBaseGlyph, decomposedBaseGlyphs, decomposing):
+        """ Replace the components of an interpolated glyph with the outlines of the interpolated base glyphs.
+            The base glyphs are interpolated with interpolateBaseGlyph(glyphName), at the same location.
+            decomposedBaseGlyphs: {glyphName: decomposed base glyph}, shared by all glyphs at this location.
+            decomposing: names of the glyphs being decomposed, to stop at component cycles.
+        """
+        for component in glyphInstanceObject.components:
+            baseGlyphName = component["baseGlyph"]
+            if baseGlyphName in decomposing:
+                continue
+            if baseGlyphName not in decomposedBaseGlyphs:
+                baseGlyph = interpolateBaseGlyph(baseGlyphName)
+                if baseGlyph is not None:
+                    baseGlyph = self._decomposeGlyphInstance(baseGlyph, interpolateBaseGlyph, decomposedBaseGlyphs, decomposing | {baseGlyphName})
+                decomposedBaseGlyphs[baseGlyphName] = baseGlyph
+            baseGlyph = decomposedBaseGlyphs[baseGlyphName]
+            if baseGlyph is None:
+                continue
+            transformPoint = Transform(*component["transformation"]).transformPoint
+            for contour in baseGlyph.contours:
+                points = [(segmentType, transformPoint(pt), smooth, name, identifier) for segmentType, pt, smooth, name, identifier in contour["points"]]
+                glyphInstanceObject.contours.append(dict(identifier=contour["identifier"], points=points))
+        glyphInstanceObject.components = []
+        return glyphInstanceObject
+
+    def _makeGlyphInstancesWithWorkers(self, glyphNames, continuousLocation, discreteLocation, decomposeComponents, bend, workers, decomposeAfterInterpolation=False):
+        # split the glyphs in shards and calculate them in a process pool.
+        # the shards are merged back in the original glyph order.
+        shardCount = min(len(glyphNames), workers * 4)
+        shardSize = -(-len(glyphNames) // shardCount)
+        shards = [glyphNames[i:i + shardSize] for i in range(0, len(glyphNames), shardSize)]
         if self.debug:
-            self.logger.info(f"\t\t\t{len(selectedGlyphNames)} glyphs added")
-        return font
+            self.logger.info(f"\t\t\tmaking {len(glyphNames)} glyphs in {len(shards)} shards with {workers} workers")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_initializeWorker, initargs=self._getWorkerArguments()) as executor:
+            futures = [executor.submit(_workerMakeGlyphInstances, shard, continuousLocation, discreteLocation, decomposeComponents, bend, decomposeAfterInterpolation) for shard in shards]
+            for future in futures:
+                for item in future.result():
+                    yield item
 
     def randomLocation(self, extrapolate=0, anisotropic=False, roundValues=True):
         """A good random location, for quick testing and entertainment
@@ -1284,11 +1934,15 @@ class UFOOperator(object):
         data = dict(unitsPerEm=infoInstanceObject.unitsPerEm, ascender=infoInstanceObject.ascender, descender=infoInstanceObject.descender, xHeight=infoInstanceObject.xHeight)
         return data
 
-    def makeOneGlyph(self, glyphName, location, decomposeComponents=True, useVarlib=False, roundGeometry=False, clip=False):
+    def makeOneGlyph(self, glyphName, location, decomposeComponents=True, useVarlib=False, roundGeometry=False, clip=False, decomposeAfterInterpolation=False):
         """
         glyphName:
         location: location including discrete axes, in **designspace** coordinates.
         decomposeComponents: decompose all components so we get a proper representation of the shape
+        decomposeAfterInterpolation: with decomposeComponents, interpolate the glyph with its components,
+            then decompose it with the base glyphs interpolated at the same location.
+            Faster for previews of composites, but the component transformations are interpolated
+            instead of the decomposed points, so scaled components can come out different.
         useVarlib: use varlib as mathmodel. Otherwise it is mutatorMath
         roundGeometry: round all geometry to integers
         clip: restrict axis values to the defined minimum and maximum
@@ -1297,7 +1951,52 @@ class UFOOperator(object):
         + Supports anisotropic locations for varlib and mutatormath. Obviously this will not be present in any Variable font exports.
 
         Returns: a mathglyph, results are cached
+            The results are kept in self.glyphResultCache, the location is rounded to self.glyphResultDigits first.
+            A copy of the cached glyph is returned, so it can be changed.
+            glyphChanged() removes the results for the glyph and the glyphs that use it as a component.
         """
+        cache = self.glyphResultCache
+        if cache is None:
+            return self._makeOneGlyph(glyphName, location, decomposeComponents, useVarlib, roundGeometry, clip, decomposeAfterInterpolation)
+        location = self._roundLocation(location, self.glyphResultDigits)
+        key = ("makeOneGlyph",
+            glyphName,
+            freezeLocation(location),
+            (decomposeComponents, useVarlib, roundGeometry, clip, decomposeAfterInterpolation),
+            (self.extrapolate, self.strict, self.useNumpy, immutify(self.mutedAxisNames)),
+            )
+        glyphInstanceObject = cache.get(key, _missing)
+        if glyphInstanceObject is _missing:
+            glyphInstanceObject = self._makeOneGlyph(glyphName, location, decomposeComponents, useVarlib, roundGeometry, clip, decomposeAfterInterpolation)
+            continuousLocation, discreteLocation = self.splitLocation(location)
+            cache.set(key, glyphInstanceObject, glyphName=glyphName, discreteLocation=discreteLocation)
+        if glyphInstanceObject is None:
+            return None
+        # the cached glyph is never given out, a caller may change the glyph it gets
+        return glyphInstanceObject.copy()
+
+    def getGlyphResultStatistics(self):
+        """ Return the hits, misses and size of the makeOneGlyph result cache. """
+        if self.glyphResultCache is None:
+            return None
+        statistics = self.glyphResultCache.getStatistics()
+        calls = statistics["hits"] + statistics["misses"]
+        statistics["hitRate"] = statistics["hits"] / calls if calls else 0
+        return statistics
+
+    def _roundLocation(self, location, digits):
+        # anisotropic values, lists or tuples, are returned as tuples so the location can be hashed
+        rounded = {}
+        for name, value in location.items():
+            if isinstance(value, (list, tuple)):
+                rounded[name] = tuple(v if digits is None else round(v, digits) for v in value)
+            elif digits is None:
+                rounded[name] = value
+            else:
+                rounded[name] = round(value, digits)
+        return rounded
+
+    def _makeOneGlyph(self, glyphName, location, decomposeComponents=True, useVarlib=False, roundGeometry=False, clip=False, decomposeAfterInterpolation=False):
         continuousLocation, discreteLocation = self.splitLocation(location)
 
         bend=False  #
@@ -1312,21 +2011,36 @@ class UFOOperator(object):
         previousModel = self.useVarlib
         self.useVarlib = useVarlib
         glyphInstanceObject = None
+        decomposeAfterInterpolation = decomposeComponents and decomposeAfterInterpolation
+        if decomposeAfterInterpolation:
+            decomposeComponents = False
         glyphMutator, unicodes = self.getGlyphMutator(glyphName, decomposeComponents=decomposeComponents, discreteLocation=discreteLocation)
         if not glyphMutator: return None
         try:
             if not self.isAnisotropic(location):
-                glyphInstanceObject = glyphMutator.makeInstance(continuousLocation, bend=bend)
+                if decomposeAfterInterpolation:
+                    interpolateDecomposed = self._makeDecomposingInterpolator(
+                        lambda glyphMutator, location: glyphMutator.makeInstance(location, bend=bend),
+                        [continuousLocation], discreteLocation)
+                    glyphInstanceObject = interpolateDecomposed(glyphMutator, glyphName)
+                else:
+                    glyphInstanceObject = glyphMutator.makeInstance(continuousLocation, bend=bend)
             else:
                 if self.debug:
                     self.logger.info(f"\t\tmakeOneGlyph anisotropic location: {location}")
                 loc = Location(continuousLocation)
                 locHorizontal, locVertical = self.splitAnisotropic(loc)
-                # split anisotropic location into horizontal and vertical components
-                horizontalGlyphInstanceObject = glyphMutator.makeInstance(locHorizontal, bend=bend)
-                verticalGlyphInstanceObject = glyphMutator.makeInstance(locVertical, bend=bend)
-                # merge them again
-                glyphInstanceObject = (1, 0) * horizontalGlyphInstanceObject + (0, 1) * verticalGlyphInstanceObject
+                if decomposeAfterInterpolation:
+                    interpolateDecomposed = self._makeDecomposingInterpolator(
+                        lambda glyphMutator, location: glyphMutator.makeInstance(location, bend=bend),
+                        [locHorizontal, locVertical], discreteLocation)
+                    glyphInstanceObject = interpolateDecomposed(glyphMutator, glyphName)
+                else:
+                    # split anisotropic location into horizontal and vertical components
+                    horizontalGlyphInstanceObject = glyphMutator.makeInstance(locHorizontal, bend=bend)
+                    verticalGlyphInstanceObject = glyphMutator.makeInstance(locVertical, bend=bend)
+                    # merge them again
+                    glyphInstanceObject = (1, 0) * horizontalGlyphInstanceObject + (0, 1) * verticalGlyphInstanceObject
                 if self.debug:
                     self.logger.info(f"makeOneGlyph anisotropic glyphInstanceObject {glyphInstanceObject}")
         except IndexError:
@@ -1342,6 +2056,83 @@ class UFOOperator(object):
         self.useVarlib = previousModel
         return glyphInstanceObject
 
+    def makeGlyphs(self, glyphNames, locations, decomposeComponents=True, useVarlib=False, roundGeometry=False, decomposeAfterInterpolation=False):
+        """
+        Calculate a list of glyphs at a list of locations in one call.
+        glyphNames: list of glyphnames
+        locations: list of locations including discrete axes, in **designspace** coordinates.
+        decomposeComponents, useVarlib, roundGeometry, decomposeAfterInterpolation: see makeOneGlyph
+            With decomposeAfterInterpolation each base glyph is interpolated once for each location.
+
+        The scalars for a location are calculated once and then used for all
+        glyphs that have their masters at the same locations.
+
+        Returns: a list with a {glyphName: mathglyph} dict for each location.
+            Glyphs that could not be calculated are None.
+        """
+        previousModel = self.useVarlib
+        self.useVarlib = useVarlib
+        scalarsCache = {}
+        results = []
+        decomposeAfterInterpolation = decomposeComponents and decomposeAfterInterpolation
+        if decomposeAfterInterpolation:
+            decomposeComponents = False
+        for location in locations:
+            continuousLocation, discreteLocation = self.splitLocation(location)
+            if not self.extrapolate:
+                continuousLocation = self.clipDesignLocation(continuousLocation)
+            glyphs = {}
+            results.append(glyphs)
+            if not self.checkDiscreteAxisValues(discreteLocation):
+                if self.debug:
+                    self.logger.info(f"\t\tmakeGlyphs reports: {location} has illegal value for discrete location")
+                for glyphName in glyphNames:
+                    glyphs[glyphName] = None
+                continue
+            anisotropic = self.isAnisotropic(location)
+            if anisotropic:
+                locHorizontal, locVertical = self.splitAnisotropic(Location(continuousLocation))
+            if decomposeAfterInterpolation:
+                interpolateDecomposed = self._makeDecomposingInterpolator(
+                    lambda glyphMutator, location: self._makeInstanceWithScalars(glyphMutator, location, scalarsCache),
+                    [locHorizontal, locVertical] if anisotropic else [continuousLocation],
+                    discreteLocation)
+            for glyphName in glyphNames:
+                glyphInstanceObject = None
+                glyphMutator, unicodes = self.getGlyphMutator(glyphName, decomposeComponents=decomposeComponents, discreteLocation=discreteLocation)
+                if glyphMutator:
+                    try:
+                        if decomposeAfterInterpolation:
+                            glyphInstanceObject = interpolateDecomposed(glyphMutator, glyphName)
+                        elif not anisotropic:
+                            glyphInstanceObject = self._makeInstanceWithScalars(glyphMutator, continuousLocation, scalarsCache)
+                        else:
+                            horizontalGlyphInstanceObject = self._makeInstanceWithScalars(glyphMutator, locHorizontal, scalarsCache)
+                            verticalGlyphInstanceObject = self._makeInstanceWithScalars(glyphMutator, locVertical, scalarsCache)
+                            glyphInstanceObject = (1, 0) * horizontalGlyphInstanceObject + (0, 1) * verticalGlyphInstanceObject
+                    except IndexError:
+                        # alignment problem with the data?
+                        if self.debug:
+                            note = "makeGlyphs: Quite possibly some sort of data alignment error in %s" % glyphName
+                            self.logger.info(note)
+                if glyphInstanceObject:
+                    glyphInstanceObject.unicodes = unicodes
+                    if roundGeometry:
+                        glyphInstanceObject = glyphInstanceObject.round()
+                glyphs[glyphName] = glyphInstanceObject
+        self.useVarlib = previousModel
+        return results
+
+    def _makeInstanceWithScalars(self, glyphMutator, location, scalarsCache, bend=False):
+        # varlib mutators with the same master locations share the master scalars for a location
+        if not isinstance(glyphMutator, VariationModelMutator) or not hasattr(glyphMutator.model, "getMasterScalars"):
+            return glyphMutator.makeInstance(location, bend=bend)
+        key = (glyphMutator.masterLocationsKey, immutify(dict(location)), bend)
+        masterScalars = scalarsCache.get(key)
+        if masterScalars is None:
+            masterScalars = scalarsCache[key] = glyphMutator.getMasterScalars(location, bend=bend)
+        return glyphMutator.makeInstanceFromMasterScalars(masterScalars)
+
     def _copyFontInfo(self, sourceInfo, targetInfo):
         """ Copy the non-calculating fields from the source info."""
         infoAttributes = [
@@ -1395,6 +2186,30 @@ class UFOOperator(object):
 
 
 
+# worker processes for UFOOperator
+
+_workerOperator = None
+
+def _initializeWorker(operatorClass, doc, settings, attributes, glyphNames):
+    # make an operator for this process, with its own sources and caches
+    global _workerOperator
+    _workerOperator = operatorClass(doc, **settings)
+    for name, value in attributes.items():
+        setattr(_workerOperator, name, value)
+    _workerOperator.loadFonts(lazy=True)
+    _workerOperator.glyphNames = glyphNames
+
+def _workerGenerateInstance(instanceIndex, incremental=False, streaming=False):
+    instanceDescriptor = _workerOperator.doc.instances[instanceIndex]
+    if incremental:
+        return _workerOperator._generateInstanceIncremental(instanceDescriptor, streaming=streaming)
+    return _workerOperator._generateInstance(instanceDescriptor, streaming)
+
+def _workerMakeGlyphInstances(glyphNames, continuousLocation, discreteLocation, decomposeComponents, bend, decomposeAfterInterpolation=False):
+    # return a list of (glyphName, glyphInstanceObject, unicodes) for this shard
+    return list(_workerOperator._iterGlyphInstances(glyphNames, continuousLocation, discreteLocation, decomposeComponents, bend, decomposeAfterInterpolation))
+
+
 if __name__ == "__main__":
     import time, random
     from fontParts.world import RFont
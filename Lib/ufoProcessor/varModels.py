@@ -1,7 +1,32 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import print_function, division, absolute_import
-from fontTools.varLib.models import VariationModel, normalizeLocation
+import array
+import functools
+from copy import deepcopy
+from fontTools.varLib.models import VariationModel, normalizeLocation, piecewiseLinearMap
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathKerning import MathKerning, side1Prefix, side2Prefix
+
+# numpy is optional, it makes interpolating the flattened glyph and kerning masters faster
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalizeFrozenLocation(frozenLocation, frozenAxes):
+    # normalizeLocation, for locations and axes as tuples of items
+    # the same few locations are normalized for every glyph in a font
+    return tuple(normalizeLocation(dict(frozenLocation), dict(frozenAxes)).items())
+
+
+def _getAxisMap(axis):
+    if hasattr(axis, "get_validated_map"):
+        return axis.get_validated_map()
+    return axis.map
 
 
 # alternative axisMapper that uses map_forward and map_backward from fonttools
@@ -13,6 +38,25 @@ class AxisMapper(object):
         self.axisDescriptors = {}
         for a in axes:
             self.axisDescriptors[a.name] = a
+        # lookup tables for map_forward
+        # a continuous axis interpolates between the map values
+        # a discrete axis only maps the values in the map
+        self._forwardMaps = {}
+        self._discreteAxisNames = set()
+        for a in axes:
+            axisMap = _getAxisMap(a)
+            if hasattr(a, "values"):
+                self._discreteAxisNames.add(a.name)
+                forwardMap = {}
+                for k, v in axisMap:
+                    forwardMap.setdefault(k, v)
+                self._forwardMaps[a.name] = forwardMap
+            elif axisMap:
+                self._forwardMaps[a.name] = dict(axisMap)
+            else:
+                self._forwardMaps[a.name] = None
+        self._forwardCache = {}
+        self.maxCacheSize = 1024
 
     def getMappedAxisValues(self):
         values = {}
@@ -41,26 +85,379 @@ class AxisMapper(object):
         return new
 
     def map_forward(self, location):
+        try:
+            key = tuple(location.items())
+            cached = self._forwardCache.get(key)
+        except TypeError:
+            # unhashable values
+            key = cached = None
+        if cached is not None:
+            return dict(cached)
         new = {}
         for axisName in location.keys():
             if not axisName in self.axisOrder:
                 continue
             if axisName not in location:
                 continue
-            new[axisName] = self.axisDescriptors[axisName].map_forward(location[axisName])
+            value = location[axisName]
+            forwardMap = self._forwardMaps[axisName]
+            if forwardMap is None:
+                new[axisName] = value
+            elif axisName in self._discreteAxisNames:
+                new[axisName] = forwardMap.get(value, value)
+            else:
+                new[axisName] = piecewiseLinearMap(value, forwardMap)
+        if key is not None:
+            if len(self._forwardCache) >= self.maxCacheSize:
+                self._forwardCache.clear()
+            self._forwardCache[key] = tuple(new.items())
         return new
 
 
 
+_pointStructures = {}
+
+def _internPointStructure(pointStructure):
+    # most points share one of a few (segmentType, smooth, name, identifier) tuples
+    if pointStructure[2] is not None or pointStructure[3] is not None:
+        return pointStructure
+    return _pointStructures.setdefault(pointStructure, pointStructure)
+
+
+class GlyphMasterRecord(object):
+    """ The attributes of a flattened MathGlyph master that are not
+        coordinates and not shared with the other masters.
+    """
+    __slots__ = ("name", "unicodes", "note", "lib")
+
+    def __init__(self, glyph):
+        self.name = glyph.name
+        self.unicodes = None
+        if glyph.unicodes is not None:
+            self.unicodes = tuple(glyph.unicodes)
+        self.note = glyph.note
+        self.lib = None
+        if glyph.lib:
+            self.lib = deepcopy(dict(glyph.lib))
+
+    def copyToGlyph(self, glyph):
+        # the same as MathGlyph.copyWithoutMathSubObjects
+        glyph.name = self.name
+        if self.unicodes is not None:
+            glyph.unicodes = list(self.unicodes)
+        glyph.note = self.note
+        glyph.lib = deepcopy(self.lib) if self.lib else {}
+
+
+class FlatGlyphMasters(object):
+    """ Compatible MathGlyph masters, stored as one row of coordinates per master,
+        the structure of the first master and a GlyphMasterRecord per master.
+        This takes a lot less memory than the MathGlyph masters themselves.
+
+        An instance is the sum of the master rows times the master scalars. Without
+        numpy the sum is made in the same order as MathGlyph math makes it, so the
+        results are the same. With numpy the rows are one array and the sum is a dot product.
+        The structure of the result is copied from the masters the way MathGlyph math does it.
+
+        Use flattenGlyphMasters() to make one, it returns None for masters that can not be flattened.
+    """
+
+    def __init__(self, masters, useNumpy=False):
+        template = masters[0]
+        self.records = [GlyphMasterRecord(m) for m in masters]
+        rows = [self._flatten(m) for m in masters]
+        if useNumpy and numpy is not None:
+            self.coordinates = numpy.array(rows, dtype=float)
+        else:
+            self.coordinates = [array.array("d", row) for row in rows]
+        self.useNumpy = useNumpy and numpy is not None
+        self.scaleComponentTransform = template.scaleComponentTransform
+        self.strict = template.strict
+        # everything but the coordinates, the same for all masters
+        self.contours = tuple(
+            (contour["identifier"], tuple(_internPointStructure((segmentType, smooth, name, identifier)) for segmentType, pt, smooth, name, identifier in contour["points"]))
+            for contour in template.contours)
+        self.components = tuple(tuple((k, v) for k, v in component.items() if k != "transformation") for component in template.components)
+        self.anchors = tuple(tuple((k, v) for k, v in anchor.items() if k not in ("x", "y")) for anchor in template.anchors)
+        self.imageFileName = template.image["fileName"]
+        self.imageColor = template.image["color"]
+        # MathGlyph addition groups the anchors by name
+        anchorNames = []
+        for anchor in template.anchors:
+            if anchor.get("name") not in anchorNames:
+                anchorNames.append(anchor.get("name"))
+        self.groupedAnchorOrder = sorted(range(len(template.anchors)), key=lambda i: anchorNames.index(template.anchors[i].get("name")))
+
+    @staticmethod
+    def getSignature(glyph):
+        # everything about the structure of the glyph that is not a coordinate
+        # masters with the same signature can be flattened into the same array
+        contours = tuple(
+            (c["identifier"], tuple((segmentType, smooth, name, identifier) for segmentType, pt, smooth, name, identifier in c["points"]))
+            for c in glyph.contours)
+        components = tuple((c["baseGlyph"], c["identifier"]) for c in glyph.components)
+        anchors = tuple(tuple(sorted((k, v) for k, v in a.items() if k not in ("x", "y"))) for a in glyph.anchors)
+        image = (glyph.image["fileName"], glyph.image["color"])
+        return (type(glyph), glyph.scaleComponentTransform, glyph.strict, contours, components, anchors, image)
+
+    def _flatten(self, glyph):
+        values = [glyph.width, glyph.height]
+        for contour in glyph.contours:
+            for segmentType, pt, smooth, name, identifier in contour["points"]:
+                values.extend(pt)
+        for component in glyph.components:
+            values.extend(component["transformation"])
+        for anchor in glyph.anchors:
+            values.append(anchor["x"])
+            values.append(anchor["y"])
+        values.extend(glyph.image["transformation"])
+        return values
+
+    def __len__(self):
+        return len(self.records)
+
+    def _sum(self, masterScalars):
+        if self.useNumpy:
+            return numpy.dot(numpy.array(masterScalars, dtype=float), self.coordinates).tolist()
+        # the same additions in the same order as interpolateFromValuesAndScalars with MathGlyphs
+        values = None
+        for scalar, row in zip(masterScalars, self.coordinates):
+            if not scalar:
+                continue
+            if values is None:
+                values = [value * scalar for value in row]
+            else:
+                values = [total + value * scalar for total, value in zip(values, row)]
+        return values
+
+    def _makeGlyph(self, record, values, groupAnchors=False):
+        glyph = MathGlyph(None, scaleComponentTransform=self.scaleComponentTransform, strict=self.strict)
+        record.copyToGlyph(glyph)
+        glyph.width, glyph.height = values[0], values[1]
+        index = 2
+        for identifier, points in self.contours:
+            contourPoints = []
+            for segmentType, smooth, name, pointIdentifier in points:
+                contourPoints.append((segmentType, (values[index], values[index + 1]), smooth, name, pointIdentifier))
+                index += 2
+            glyph.contours.append(dict(identifier=identifier, points=contourPoints))
+        for items in self.components:
+            component = dict(items)
+            component["transformation"] = tuple(values[index:index + 6])
+            glyph.components.append(component)
+            index += 6
+        anchors = []
+        for items in self.anchors:
+            anchor = dict(items)
+            anchor["x"], anchor["y"] = values[index], values[index + 1]
+            anchors.append(anchor)
+            index += 2
+        if not groupAnchors:
+            glyph.anchors = anchors
+        else:
+            glyph.anchors = [dict(name=a.get("name"), identifier=a.get("identifier"), x=a["x"], y=a["y"], color=a.get("color")) for a in [anchors[i] for i in self.groupedAnchorOrder]]
+        glyph.image = dict(fileName=self.imageFileName, transformation=tuple(values[index:index + 6]), color=self.imageColor)
+        return glyph
+
+    def makeInstance(self, masterScalars):
+        contributors = [i for i, scalar in enumerate(masterScalars) if scalar]
+        if not contributors:
+            return None
+        values = self._sum(masterScalars)
+        return self._makeGlyph(self.records[contributors[0]], values, groupAnchors=len(contributors) > 1)
+
+    def getMaster(self, index):
+        """ Return the MathGlyph for this master. """
+        return self._makeGlyph(self.records[index], self.coordinates[index].tolist())
+
+    def getMasters(self):
+        return [self.getMaster(index) for index in range(len(self.records))]
+
+
+def flattenGlyphMasters(masters, useNumpy=False):
+    """ Return a FlatGlyphMasters for these masters, or None if the masters are not compatible.
+        useNumpy: interpolate with numpy, if it is available.
+    """
+    if not masters:
+        return None
+    signature = None
+    for master in masters:
+        # a subclass can have its own math, it is not flattened
+        if type(master) is not MathGlyph:
+            return None
+        if master.guidelines or not master.scaleComponentTransform:
+            # guideline angles and unscaled component transformations are not linear
+            return None
+        if master.width is None or master.height is None:
+            return None
+        try:
+            masterSignature = FlatGlyphMasters.getSignature(master)
+        except (KeyError, TypeError, ValueError):
+            return None
+        if signature is None:
+            signature = masterSignature
+        elif masterSignature != signature:
+            return None
+    return FlatGlyphMasters(masters, useNumpy=useNumpy)
+
+
+class FlatKerningMasters(object):
+    """ MathKerning masters with the same groups, stored as one row of values per master
+        over the pairs of all masters. For a pair a master does not have, the row has the
+        value MathKerning.get() finds for it through the groups.
+
+        Adding MathKerning objects looks up the pairs one object does not have through
+        the groups, in the pairs of the masters that were added before. So for each set
+        of contributing masters the pair each step reads is found once, after that an
+        instance is the same additions in the same order as the MathKerning math,
+        without making a new MathKerning for each step.
+
+        Use flattenKerningMasters() to make one, it returns None for masters that can not be flattened.
+    """
+
+    def __init__(self, masters, useNumpy=False):
+        template = masters[0]
+        self.kerningClass = type(template)
+        self.groups = template.groups()
+        self._side1GroupMap = dict(template._side1GroupMap)
+        self._side2GroupMap = dict(template._side2GroupMap)
+        pairs = set()
+        for master in masters:
+            pairs.update(master.keys())
+        self.pairs = sorted(pairs)
+        self.pairIndex = {pair: index for index, pair in enumerate(self.pairs)}
+        # one more column with 0 at the end, for index -1: a pair that finds no value
+        rows = [[master.get(pair) for pair in self.pairs] + [0] for master in masters]
+        self.useNumpy = useNumpy and numpy is not None
+        if self.useNumpy:
+            self.values = numpy.array(rows, dtype=float)
+        else:
+            self.values = [array.array("d", row) for row in rows]
+        # the pairs each master has itself
+        self.masterPairIndices = [array.array("l", sorted(self.pairIndex[pair] for pair in master.keys())) for master in masters]
+        self._steps = {}
+
+    def __len__(self):
+        return len(self.masterPairIndices)
+
+    def _findPair(self, pair, pairs):
+        # the pair MathKerning.__getitem__ reads for pair, if these are the pairs it has
+        if pair in pairs:
+            return pair
+        side1, side2 = pair
+        if side1.startswith(side1Prefix):
+            side1Group = side1
+            side1 = None
+        else:
+            side1Group = self._side1GroupMap.get(side1)
+        if side2.startswith(side2Prefix):
+            side2Group = side2
+            side2 = None
+        else:
+            side2Group = self._side2GroupMap.get(side2)
+        for found in ((side1Group, side2), (side1, side2Group), (side1Group, side2Group)):
+            if found in pairs:
+                return found
+        return None
+
+    def _getSteps(self, contributors):
+        # return (output pair indices, for each contributor the pair index it adds for each output pair)
+        steps = self._steps.get(contributors)
+        if steps is not None:
+            return steps
+        added = []
+        pairs = set()
+        for index in contributors:
+            pairs = pairs | set(self.pairs[pairIndex] for pairIndex in self.masterPairIndices[index])
+            added.append(pairs)
+        outputIndices = sorted(self.pairIndex[pair] for pair in pairs)
+        columns = [array.array("l", [-1]) * len(outputIndices) for index in contributors]
+        for position, pairIndex in enumerate(outputIndices):
+            pair = self.pairs[pairIndex]
+            for step in range(len(contributors) - 1, -1, -1):
+                columns[step][position] = self.pairIndex[pair]
+                if step == 0:
+                    break
+                # the value of the steps before, for this pair
+                pair = self._findPair(pair, added[step - 1])
+                if pair is None:
+                    break
+        if self.useNumpy:
+            columns = [numpy.array(column, dtype=numpy.intp) for column in columns]
+        steps = outputIndices, columns
+        self._steps[contributors] = steps
+        return steps
+
+    def _makeKerning(self, kerning):
+        return self.kerningClass(kerning, self.groups)
+
+    def makeInstance(self, masterScalars):
+        contributors = tuple(i for i, scalar in enumerate(masterScalars) if scalar)
+        if not contributors:
+            return None
+        outputIndices, columns = self._getSteps(contributors)
+        values = None
+        for index, column in zip(contributors, columns):
+            row = self.values[index]
+            scalar = masterScalars[index]
+            if self.useNumpy:
+                if values is None:
+                    values = row[column] * scalar
+                else:
+                    values = values + row[column] * scalar
+            elif values is None:
+                values = [row[i] * scalar for i in column]
+            else:
+                values = [total + row[i] * scalar for total, i in zip(values, column)]
+        if self.useNumpy:
+            values = values.tolist()
+        pairs = self.pairs
+        instance = self._makeKerning({pairs[i]: value for i, value in zip(outputIndices, values)})
+        instance.cleanup()
+        return instance
+
+    def getMaster(self, index):
+        """ Return the MathKerning for this master. """
+        row = self.values[index]
+        kerning = {}
+        for pairIndex in self.masterPairIndices[index]:
+            value = float(row[pairIndex])
+            if value.is_integer():
+                value = int(value)
+            kerning[self.pairs[pairIndex]] = value
+        return self._makeKerning(kerning)
+
+    def getMasters(self):
+        return [self.getMaster(index) for index in range(len(self))]
+
+
+def flattenKerningMasters(masters, useNumpy=False):
+    """ Return a FlatKerningMasters for these masters, or None if the masters do not have the same groups.
+        useNumpy: interpolate with numpy, if it is available.
+    """
+    if not masters:
+        return None
+    groups = masters[0].groups()
+    for master in masters:
+        # a subclass can have its own math, it is not flattened
+        if type(master) is not MathKerning:
+            return None
+        # with other groups MathKerning math merges the groups and finds other values
+        if master.groups() != groups:
+            return None
+    return FlatKerningMasters(masters, useNumpy=useNumpy)
+
+
 class VariationModelMutator(object):
     """ a thing that looks like a mutator on the outside,
         but uses the fonttools varlib logic to calculate.
     """
 
-    def __init__(self, items, axes, model=None, extrapolate=True):
+    def __init__(self, items, axes, model=None, extrapolate=True, useNumpy=False):
         # items: list of locationdict, value tuples
         # axes: list of axis dictionaries, not axisdescriptor objects.
         # model: a model, if we want to share one
+        # useNumpy: interpolate compatible MathGlyph and MathKerning masters with numpy, if it is available
         self.extrapolate = extrapolate
         self.axisOrder = [a.name for a in axes]
         self.axisMapper = AxisMapper(axes)
@@ -69,15 +466,43 @@ class VariationModelMutator(object):
             axisMinimum, axisMaximum = self.getAxisMinMax(a)
             mappedMinimum, mappedDefault, mappedMaximum = a.map_forward(axisMinimum), a.map_forward(a.default), a.map_forward(axisMaximum)
             self.axes[a.name] = (mappedMinimum, mappedDefault, mappedMaximum)
-            
+        self._frozenAxes = tuple(self.axes.items())
+
+        dd = [self._normalize(a) for a,b in items]
+        # mutators with the same masterLocationsKey return the same master scalars
+        self.masterLocationsKey = tuple(tuple(sorted(loc.items())) for loc in dd)
         if model is None:
-            dd = [self._normalize(a) for a,b in items]
             ee = self.axisOrder
             self.model = VariationModel(dd, axisOrder=ee, extrapolate=self.extrapolate)
         else:
             self.model = model
-        self.masters = [b for a, b in items]
+        masters = [b for a, b in items]
         self.locations = [a for a, b in items]
+        self.flatMasters = None
+        if hasattr(self.model, "getMasterScalars"):
+            if masters and isinstance(masters[0], MathKerning):
+                self.flatMasters = flattenKerningMasters(masters, useNumpy=useNumpy)
+            else:
+                self.flatMasters = flattenGlyphMasters(masters, useNumpy=useNumpy)
+        # compatible glyph and kerning masters are only kept flattened
+        self._masters = None
+        if self.flatMasters is None:
+            self._masters = masters
+        self._deltas = None
+
+    @property
+    def masters(self):
+        # with flattened masters this is a new list of new master objects every time,
+        # changing them does not change the mutator
+        if self._masters is None:
+            return self.flatMasters.getMasters()
+        return self._masters
+
+    def getMaster(self, index):
+        # only make the one master that is asked for
+        if self._masters is None:
+            return self.flatMasters.getMaster(index)
+        return self._masters[index]
 
     def getAxisMinMax(self, axis):
         # return tha axis.minimum and axis.maximum for continuous axes
@@ -89,7 +514,7 @@ class VariationModelMutator(object):
     def get(self, key):
         if key in self.model.locations:
             i = self.model.locations.index(key)
-            return self.masters[i]
+            return self.getMaster(i)
         return None
 
     def getFactors(self, location):
@@ -97,6 +522,7 @@ class VariationModelMutator(object):
         return self.model.getScalars(nl)
 
     def getMasters(self):
+        # copies with flattened masters, see masters
         return self.masters
 
     def getSupports(self):
@@ -106,18 +532,46 @@ class VariationModelMutator(object):
         items = []
         for supportIndex, s in enumerate(self.getSupports()):
             sortedOrder = self.model.reverseMapping[supportIndex]
-            items.append((self.masters[sortedOrder], s))
+            items.append((self.getMaster(sortedOrder), s))
         return items
 
+    def getDeltas(self):
+        # the deltas are calculated once and then kept
+        if self._deltas is None:
+            self._deltas = self.model.getDeltas(self.masters)
+        return self._deltas
+
     def makeInstance(self, location, bend=False):
         # check for anisotropic locations here
         if bend:
             location = self.axisMapper(location)
         nl = self._normalize(location)
+        if self.flatMasters is not None:
+            return self.flatMasters.makeInstance(self.model.getMasterScalars(nl))
+        if not hasattr(self.model, "getMasterScalars"):
+            # older fontTools calculates the deltas for every interpolateFromMasters call
+            return self.model.interpolateFromDeltas(nl, self.getDeltas())
         return self.model.interpolateFromMasters(nl, self.masters)
 
+    def getMasterScalars(self, location, bend=False):
+        # the factor for each master at this location
+        if bend:
+            location = self.axisMapper(location)
+        nl = self._normalize(location)
+        return self.model.getMasterScalars(nl)
+
+    def makeInstanceFromMasterScalars(self, masterScalars):
+        # makeInstance, with the master scalars from getMasterScalars
+        if self.flatMasters is not None:
+            return self.flatMasters.makeInstance(masterScalars)
+        return self.model.interpolateFromValuesAndScalars(self.masters, masterScalars)
+
     def _normalize(self, location):
-        return normalizeLocation(location, self.axes)
+        try:
+            return dict(_normalizeFrozenLocation(tuple(location.items()), self._frozenAxes))
+        except TypeError:
+            # unhashable values
+            return normalizeLocation(location, self.axes)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,68 @@
+# helpers for the ds5 tests that compare generated instances
+
+import os
+import shutil
+import tempfile
+
+from ufoProcessor.ufoOperator import UFOOperator
+from ufoProcessor.fingerprints import getFingerprintsPath
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+
+def copyDesignspace(name="ds5.designspace"):
+    # copy the designspace and the sources to a new temporary folder, return the path of the copy
+    folder = tempfile.mkdtemp()
+    shutil.copy(os.path.join(here, name), folder)
+    shutil.copytree(os.path.join(here, "sources"), os.path.join(folder, "sources"))
+    return os.path.join(folder, name)
+
+
+def makeOperator(path, **attributes):
+    doc = UFOOperator()
+    doc.read(path)
+    for name, value in attributes.items():
+        setattr(doc, name, value)
+    return doc
+
+
+def generate(path, loadFonts=None, attributes=None, copyLib=False, **kwargs):
+    # generate all instances in path with a new UFOOperator, return the operator
+    # loadFonts: arguments for loadFonts, attributes: attributes to set on the operator
+    # copyLib: copy the lib of the first source to the instances
+    doc = makeOperator(path, **(attributes or {}))
+    if copyLib:
+        doc.doc.sources[0].copyLib = True
+    doc.loadFonts(**(loadFonts or {}))
+    doc.generateUFOs(**kwargs)
+    return doc
+
+
+def readFiles(folder):
+    # return {relative path: data} for all files in folder, without the fingerprints
+    ignore = set()
+    for name in os.listdir(folder):
+        ignore.add(os.path.relpath(getFingerprintsPath(os.path.join(folder, name)), folder))
+    files = {}
+    for root, folderNames, fileNames in os.walk(folder):
+        for fileName in fileNames:
+            filePath = os.path.join(root, fileName)
+            relativePath = os.path.relpath(filePath, folder)
+            if relativePath in ignore:
+                continue
+            with open(filePath, "rb") as f:
+                files[relativePath] = f.read()
+    return files
+
+
+def compareInstances(path1, path2):
+    # return the relative paths of the files that differ in the instance folders of these designspaces
+    files1 = readFiles(os.path.join(os.path.dirname(path1), "instances"))
+    files2 = readFiles(os.path.join(os.path.dirname(path2), "instances"))
+    assert files1, "no instances were generated"
+    return sorted(name for name in set(files1) | set(files2) if files1.get(name) != files2.get(name))
+
+
+def removeDesignspace(*paths):
+    for path in paths:
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
@@ -0,0 +1,30 @@
+# test makeOneGlyph with anisotropic locations, as lists and as tuples, with and without the result cache
+
+from ds5_compareUFOs import copyDesignspace, makeOperator, removeDesignspace
+
+
+def getOutline(glyph):
+    return [[point[:2] for point in contour["points"]] for contour in glyph.contours], glyph.width
+
+
+# with extrapolate the location is not clipped, clipping does not take anisotropic values
+path = copyDesignspace()
+results = []
+for glyphResultCache in (True, False):
+    doc = makeOperator(path, extrapolate=True)
+    if not glyphResultCache:
+        doc.glyphResultCache = None
+    doc.loadFonts()
+    for width in ([500, 800], (500, 800)):
+        location = dict(width=width, countedItems=1, outlined=0)
+        glyph = doc.makeOneGlyph("glyphOne", location)
+        assert glyph is not None
+        results.append(getOutline(glyph))
+        # again, from the cache
+        assert getOutline(doc.makeOneGlyph("glyphOne", location)) == results[-1]
+assert all(result == results[0] for result in results)
+# not the same as an isotropic location
+assert getOutline(doc.makeOneGlyph("glyphOne", dict(width=500, countedItems=1, outlined=0))) != results[0]
+
+removeDesignspace(path)
+print("anisotropic location ok")
@@ -0,0 +1,52 @@
+# test the compatibility check before generating instances
+
+import os
+
+import defcon
+
+from ds5_compareUFOs import copyDesignspace, makeOperator, generate, compareInstances, removeDesignspace
+
+checkedPath = copyDesignspace()
+fullPath = copyDesignspace()
+
+# compatible sources: nothing is reported and the instances are the same
+generate(fullPath)
+doc = makeOperator(checkedPath)
+doc.loadFonts()
+assert doc.checkGlyphCompatibility() == []
+assert doc.getIncompatibleGlyphNames(dict(countedItems=1, outlined=0)) == []
+doc.generateUFOs()
+assert compareInstances(checkedPath, fullPath) == []
+
+# an extra contour in one source
+for path in (checkedPath, fullPath):
+    font = defcon.Font(os.path.join(os.path.dirname(path), "sources/geometrySource_c_1000_d1_1_d2_0.ufo"))
+    pen = font["glyphTwo"].getPen()
+    pen.moveTo((0, 0))
+    pen.lineTo((100, 0))
+    pen.lineTo((100, 100))
+    pen.closePath()
+    font.save()
+generate(fullPath)
+doc = makeOperator(checkedPath)
+doc.loadFonts()
+report = doc.checkGlyphCompatibility()
+assert len(report) == 1
+assert report[0]["glyphName"] == "glyphTwo"
+assert report[0]["discreteLocation"] == dict(countedItems=1, outlined=0)
+assert report[0]["problems"]
+assert doc.getIncompatibleGlyphNames(dict(countedItems=1, outlined=0)) == ["glyphTwo"]
+assert doc.getIncompatibleGlyphNames(dict(countedItems=2, outlined=0)) == []
+doc.generateUFOs()
+
+# only that glyph in that discrete location is different, it is empty and keeps its unicodes
+differences = compareInstances(checkedPath, fullPath)
+assert differences
+for name in differences:
+    assert name.endswith("_d1_1_d2_0.ufo/glyphs/glyphT_wo.glif"), name
+    glyph = defcon.Font(os.path.join(os.path.dirname(checkedPath), "instances", os.path.dirname(os.path.dirname(name))))["glyphTwo"]
+    assert len(glyph) == 0 and len(glyph.components) == 0
+    assert glyph.unicodes == [0x62]
+
+removeDesignspace(checkedPath, fullPath)
+print("glyph compatibility ok")
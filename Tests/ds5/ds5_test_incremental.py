@@ -0,0 +1,55 @@
+# test that incremental generation makes the same instances as a full run
+
+import os
+import plistlib
+
+import defcon
+
+from ds5_compareUFOs import copyDesignspace, generate, compareInstances, removeDesignspace
+
+sourceName = "sources/geometrySource_c_400_d1_1_d2_0.ufo"
+
+
+def editGlyph(path, glyphName):
+    font = defcon.Font(os.path.join(os.path.dirname(path), sourceName))
+    font[glyphName].width += 100
+    font.save()
+
+
+def editFontData(path, glyphOrder):
+    font = defcon.Font(os.path.join(os.path.dirname(path), sourceName))
+    font.kerning[("glyphOne", "glyphTwo")] = -123
+    font.lib["ufoProcessor.test.lib.entry"] = "Changed lib entry"
+    font.glyphOrder = glyphOrder
+    font.save()
+
+
+# the lib of the first source is copied to the instances, with its glyph order
+incrementalPath = copyDesignspace()
+doc = generate(incrementalPath, copyLib=True, incremental=True)
+with open(os.path.join(doc.instances[0].path, "lib.plist"), "rb") as f:
+    glyphOrder = plistlib.load(f)["public.glyphOrder"]
+
+# one glyph changed, the first one so that it can not keep its place by accident
+editGlyph(incrementalPath, glyphOrder[0])
+generate(incrementalPath, copyLib=True, incremental=True)
+fullPath = copyDesignspace()
+editGlyph(fullPath, glyphOrder[0])
+generate(fullPath, copyLib=True)
+assert compareInstances(incrementalPath, fullPath) == []
+
+# the kerning, the lib and a glyph changed, the glyph order in the lib misses the first glyph
+editFontData(incrementalPath, glyphOrder[1:])
+editGlyph(incrementalPath, glyphOrder[-1])
+generate(incrementalPath, copyLib=True, incremental=True)
+editFontData(fullPath, glyphOrder[1:])
+editGlyph(fullPath, glyphOrder[-1])
+generate(fullPath, copyLib=True)
+assert compareInstances(incrementalPath, fullPath) == []
+
+# nothing changed
+generate(incrementalPath, copyLib=True, incremental=True)
+assert compareInstances(incrementalPath, fullPath) == []
+
+removeDesignspace(incrementalPath, fullPath)
+print("incremental ok")
@@ -0,0 +1,32 @@
+# test that instances made with InstanceFont are the same as instances made with defcon
+
+import os
+
+import defcon
+
+from ufoProcessor.instanceFont import InstanceFont, InstanceGlyph
+
+from ds5_compareUFOs import copyDesignspace, generate, compareInstances, removeDesignspace
+
+instanceAttributes = dict(instanceFontClass=InstanceFont, instanceGlyphClass=InstanceGlyph)
+
+instanceFontPath = copyDesignspace()
+fullPath = copyDesignspace()
+# the lib of the first source is copied, the glyph order in it misses a glyph
+for path in (instanceFontPath, fullPath):
+    font = defcon.Font(os.path.join(os.path.dirname(path), "sources/geometrySource_c_400_d1_1_d2_0.ufo"))
+    font.glyphOrder = ["glyphTwo"]
+    font.save()
+generate(fullPath, copyLib=True)
+
+doc = generate(instanceFontPath, attributes=instanceAttributes, copyLib=True)
+assert compareInstances(instanceFontPath, fullPath) == []
+font = doc.makeInstance(doc.instances[0])
+assert isinstance(font, InstanceFont)
+assert isinstance(font[doc.glyphNames[0]], InstanceGlyph)
+
+generate(instanceFontPath, attributes=instanceAttributes, copyLib=True, streaming=True)
+assert compareInstances(instanceFontPath, fullPath) == []
+
+removeDesignspace(instanceFontPath, fullPath)
+print("instance font ok")
@@ -0,0 +1,18 @@
+# test that instances made from lazily loaded sources are the same as from loaded sources
+
+from ds5_compareUFOs import copyDesignspace, makeOperator, generate, compareInstances, removeDesignspace
+
+lazyPath = copyDesignspace()
+fullPath = copyDesignspace()
+fullDoc = generate(fullPath)
+
+doc = makeOperator(lazyPath)
+doc.loadFonts(lazy=True)
+assert sorted(doc.glyphNames) == sorted(fullDoc.glyphNames)
+# nothing is opened yet
+assert not any(doc.fonts.isOpen(sourceDescriptor.name) for sourceDescriptor in doc.doc.sources)
+doc.generateUFOs()
+assert compareInstances(lazyPath, fullPath) == []
+
+removeDesignspace(lazyPath, fullPath)
+print("lazy fonts ok")
@@ -0,0 +1,83 @@
+# test that subclasses of the fontMath classes keep their own math
+
+from fontMath.mathGlyph import MathGlyph
+from fontMath.mathKerning import MathKerning
+
+from ds5_compareUFOs import copyDesignspace, makeOperator, removeDesignspace
+
+
+class CountingMathGlyph(MathGlyph):
+    calls = 0
+
+    def __add__(self, other):
+        CountingMathGlyph.calls += 1
+        return super().__add__(other)
+
+    def __sub__(self, other):
+        CountingMathGlyph.calls += 1
+        return super().__sub__(other)
+
+    def __mul__(self, factor):
+        CountingMathGlyph.calls += 1
+        return super().__mul__(factor)
+
+    __rmul__ = __mul__
+
+
+class CountingMathKerning(MathKerning):
+    calls = 0
+
+    def __add__(self, other):
+        CountingMathKerning.calls += 1
+        return super().__add__(other)
+
+    def __sub__(self, other):
+        CountingMathKerning.calls += 1
+        return super().__sub__(other)
+
+    def __mul__(self, factor):
+        CountingMathKerning.calls += 1
+        return super().__mul__(factor)
+
+    __rmul__ = __mul__
+
+
+def getOutline(glyph):
+    return [[point[:2] for point in contour["points"]] for contour in glyph.contours], glyph.width
+
+
+discreteLocation = dict(countedItems=1, outlined=0)
+location = dict(width=700, **discreteLocation)
+path = copyDesignspace()
+
+doc = makeOperator(path)
+doc.loadFonts()
+mutator = doc.getGlyphMutator("glyphOne", discreteLocation=discreteLocation)[0]
+assert mutator.flatMasters is not None
+expected = getOutline(doc.makeOneGlyph("glyphOne", location))
+
+doc = makeOperator(path, mathGlyphClass=CountingMathGlyph)
+doc.loadFonts()
+mutator = doc.getGlyphMutator("glyphOne", discreteLocation=discreteLocation)[0]
+assert mutator.flatMasters is None
+assert all(type(master) is CountingMathGlyph for master in mutator.masters)
+assert getOutline(doc.makeOneGlyph("glyphOne", location)) == expected
+assert CountingMathGlyph.calls > 0
+
+# kerning
+doc = makeOperator(path)
+doc.loadFonts()
+mutator = doc.getKerningMutator(discreteLocation=discreteLocation)
+assert mutator.flatMasters is not None
+expected = dict(mutator.makeInstance(dict(width=700)).items())
+
+doc = makeOperator(path, mathKerningClass=CountingMathKerning)
+doc.loadFonts()
+mutator = doc.getKerningMutator(discreteLocation=discreteLocation)
+assert mutator.flatMasters is None
+assert all(type(master) is CountingMathKerning for master in mutator.masters)
+assert dict(mutator.makeInstance(dict(width=700)).items()) == expected
+assert CountingMathKerning.calls > 0
+
+removeDesignspace(path)
+print("math classes ok")
@@ -0,0 +1,37 @@
+# test that instances made with mutators from the disk cache are the same as without the cache
+
+import os
+import shutil
+import tempfile
+
+import defcon
+
+from ds5_compareUFOs import copyDesignspace, generate, compareInstances, removeDesignspace
+
+cachePath = tempfile.mkdtemp()
+cachedPath = copyDesignspace()
+fullPath = copyDesignspace()
+generate(fullPath)
+
+# the first run writes the cache, the second run reads it
+doc = generate(cachedPath, attributes=dict(mutatorCachePath=cachePath))
+assert doc.getMutatorDiskCache().writes > 0
+assert compareInstances(cachedPath, fullPath) == []
+doc = generate(cachedPath, attributes=dict(mutatorCachePath=cachePath))
+diskCache = doc.getMutatorDiskCache()
+assert diskCache.hits > 0
+assert diskCache.misses == 0
+assert compareInstances(cachedPath, fullPath) == []
+
+# a changed source is not read from the cache
+for path in (cachedPath, fullPath):
+    font = defcon.Font(os.path.join(os.path.dirname(path), "sources/geometrySource_c_1000_d1_1_d2_0.ufo"))
+    font["glyphTwo"].width += 100
+    font.save()
+generate(cachedPath, attributes=dict(mutatorCachePath=cachePath))
+generate(fullPath)
+assert compareInstances(cachedPath, fullPath) == []
+
+removeDesignspace(cachedPath, fullPath)
+shutil.rmtree(cachePath)
+print("mutator disk cache ok")
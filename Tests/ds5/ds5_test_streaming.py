@@ -0,0 +1,31 @@
+# test that instances written while they are made are the same as instances saved at the end
+
+import os
+
+import defcon
+
+from ds5_compareUFOs import copyDesignspace, generate, compareInstances, removeDesignspace
+
+streamingPath = copyDesignspace()
+fullPath = copyDesignspace()
+generate(fullPath)
+
+generate(streamingPath, streaming=True)
+assert compareInstances(streamingPath, fullPath) == []
+
+# writing over existing instances, and no temporary folders are left behind
+doc = generate(streamingPath, streaming=True)
+assert compareInstances(streamingPath, fullPath) == []
+instanceFolder = os.path.dirname(doc.instances[0].path)
+assert sorted(os.listdir(instanceFolder)) == sorted(os.path.basename(instanceDescriptor.path) for instanceDescriptor in doc.instances)
+
+# the lib of a source is copied, the glyph order in it misses a glyph
+for path in (streamingPath, fullPath):
+    font = defcon.Font(os.path.join(os.path.dirname(path), "sources/geometrySource_c_400_d1_1_d2_0.ufo"))
+    font.glyphOrder = ["glyphTwo"]
+    font.save()
+    generate(path, copyLib=True, streaming=path == streamingPath)
+assert compareInstances(streamingPath, fullPath) == []
+
+removeDesignspace(streamingPath, fullPath)
+print("streaming ok")
@@ -0,0 +1,19 @@
+# test that instances made with worker processes are the same as instances made in one process
+
+from ds5_compareUFOs import copyDesignspace, generate, compareInstances, removeDesignspace
+
+if __name__ == "__main__":
+    # the workers import this script again where processes are spawned
+    workersPath = copyDesignspace()
+    fullPath = copyDesignspace()
+    generate(fullPath)
+
+    generate(workersPath, workers=2)
+    assert compareInstances(workersPath, fullPath) == []
+
+    # incremental, with workers
+    generate(workersPath, workers=2, incremental=True)
+    assert compareInstances(workersPath, fullPath) == []
+
+    removeDesignspace(workersPath, fullPath)
+    print("workers ok")
@@ -33,6 +33,9 @@ setup(
         "fontTools[ufo,lxml]>=3.32.0",
         "mutatorMath>=2.1.2",
     ],
+    extras_require={
+        "numpy": ["numpy"],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "Environment :: Console",